@@ -0,0 +1,50 @@
+"""Fixtures shared by the benchmarks: synthetic accounts, stand-in prices and timing."""
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from craft import MATERIAL_KEYS, RARITIES, RESOURCES  # noqa: E402
+from valuation import BOSS_CATALOG, tiers_in_group  # noqa: E402
+
+
+class Prices:
+    """Stand-in for BossPrices so the benchmarks do not need a database"""
+
+    def __init__(self):
+        for tier in BOSS_CATALOG:
+            setattr(self, tier.price_field, round(random.uniform(0, 1), 3))
+
+
+def make_accounts(n):
+    """Full accounts as stored (BSON dates as datetimes), seeded by the random module"""
+    now = datetime.now(timezone.utc).replace(microsecond=123000)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Conta {i}",
+            "bosses": {tier.key: random.randint(0, 50) for tier in tiers_in_group("bosses")},
+            "sala_pico": "",
+            "special_bosses": {tier.key: random.randint(0, 5) for tier in tiers_in_group("special_bosses")},
+            "materials": {m: {r: random.randint(0, 500) for r in RARITIES} for m in MATERIAL_KEYS},
+            "craft_resources": {r: random.randint(0, 100_000) for r in RESOURCES},
+            "gold": round(random.uniform(0, 10_000), 2),
+            "confirmed": random.random() < 0.5,
+            "confirmed_at": now,
+            "created_at": now,
+        }
+        for i in range(n)
+    ]
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
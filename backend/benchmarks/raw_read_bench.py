@@ -0,0 +1,97 @@
+"""Profile the account list read path: dict decoding vs. raw BSON (rawjson.py).
+
+Both paths start from the BSON bytes a cursor batch delivers and end with
+the JSON response body. The dict path decodes every account, values it,
+converts its dates and encodes it with orjson (GET /accounts); the raw path
+decodes RawBSONDocuments of the shaped aggregation output and hands their
+bytes to python-bsonjs (GET /accounts?raw=true). Reports time, peak memory
+per account and, with --profile, the top functions of each path.
+
+Run from backend/:  python -m benchmarks.raw_read_bench [--profile]
+"""
+import cProfile
+import pstats
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+import bson
+import orjson
+from bson.codec_options import CodecOptions
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks._common import Prices, best_of, make_accounts  # noqa: E402
+from rawjson import RAW_CODEC_OPTIONS, raw_account_json  # noqa: E402
+from valuation import value_accounts  # noqa: E402
+
+DICT_CODEC_OPTIONS = CodecOptions(tz_aware=True)
+DATE_FIELDS = ("confirmed_at", "created_at")
+
+
+def stored_batch(accounts):
+    """Accounts as find() returns them"""
+    return b"".join(bson.encode(account) for account in accounts)
+
+
+def shaped_batch(accounts):
+    """Accounts as raw_account_pipeline() returns them"""
+    documents = []
+    for account in accounts:
+        shaped = {**account, **{field: account[field].isoformat() for field in DATE_FIELDS}}
+        documents.append({"account": shaped, "counts": {group: account[group] for group in ("bosses", "special_bosses")}})
+    return b"".join(bson.encode(document) for document in documents)
+
+
+def dict_path(batch, prices):
+    accounts = bson.decode_all(batch, DICT_CODEC_OPTIONS)
+    for account, total in zip(accounts, value_accounts(accounts, prices)):
+        account["total_usd"] = total
+        for field in DATE_FIELDS:
+            account[field] = account[field].isoformat()
+    return orjson.dumps(accounts)
+
+
+def raw_path(batch, prices):
+    documents = bson.decode_all(batch, RAW_CODEC_OPTIONS)
+    return b"[" + b",".join(raw_account_json(documents, prices)) + b"]"
+
+
+def peak_bytes(fn):
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def profile(fn, title):
+    profiler = cProfile.Profile()
+    profiler.runcall(fn)
+    print(f"\n--- {title} ---")
+    pstats.Stats(profiler).sort_stats("tottime").print_stats(8)
+
+
+def main():
+    random.seed(42)
+    prices = Prices()
+    print(f"{'accounts':>9} {'path':>5} {'time':>9} {'peak/account':>13} {'body':>9}")
+    for n in (1_000, 10_000):
+        accounts = make_accounts(n)
+        stored, shaped = stored_batch(accounts), shaped_batch(accounts)
+        assert orjson.loads(dict_path(stored, prices)) == orjson.loads(raw_path(shaped, prices))
+
+        for name, fn, batch in (("dict", dict_path, stored), ("raw", raw_path, shaped)):
+            seconds = best_of(lambda: fn(batch, prices))
+            peak = peak_bytes(lambda: fn(batch, prices))
+            body = len(fn(batch, prices))
+            print(f"{n:>9} {name:>5} {seconds * 1000:>7.1f}ms {peak / n:>11.0f} B {body / 1024:>7.0f}KB")
+
+        if "--profile" in sys.argv and n == 10_000:
+            profile(lambda: dict_path(stored, prices), "dict path")
+            profile(lambda: raw_path(shaped, prices), "raw path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark the account list response: encoding time and bytes on the wire.
+
+Compares FastAPI's default path (jsonable_encoder + stdlib json, as
+JSONResponse renders it) with orjson, and the body size uncompressed, gzip
+and brotli at the middleware's settings.
+
+Run from backend/:  python -m benchmarks.serialization_bench
+"""
+import gzip
+import json
+import random
+import sys
+from pathlib import Path
+
+import brotli
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks._common import Prices, best_of, make_accounts  # noqa: E402
+from valuation import value_accounts  # noqa: E402
+
+
+def api_accounts(n, prices):
+    """Full API accounts, as GET /api/accounts returns them"""
+    accounts = make_accounts(n)
+    for account, total in zip(accounts, value_accounts(accounts, prices)):
+        account["total_usd"] = total
+        for field in ("confirmed_at", "created_at"):
+            account[field] = account[field].isoformat()
+    return accounts
+
+
+def stdlib_encode(accounts):
+    # What JSONResponse.render does after FastAPI's jsonable_encoder
+    return json.dumps(
+        jsonable_encoder(accounts), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def main():
+    random.seed(42)
+    prices = Prices()
+    print(
+        f"{'accounts':>9} {'stdlib':>9} {'orjson':>9} {'speedup':>8}"
+        f" {'raw':>9} {'gzip':>17} {'br':>17}"
+    )
+    for n in (1_000, 10_000):
+        accounts = api_accounts(n, prices)
+        body = orjson.dumps(accounts)
+        assert orjson.loads(body) == json.loads(stdlib_encode(accounts))
+
+        stdlib_s = best_of(lambda: stdlib_encode(accounts))
+        orjson_s = best_of(lambda: orjson.dumps(accounts))
+        # Starlette's GZipMiddleware default level and BrotliMiddleware's default quality
+        gzipped = len(gzip.compress(body, compresslevel=9))
+        brotlied = len(brotli.compress(body, quality=4, mode=brotli.MODE_TEXT))
+        gzip_s = best_of(lambda: gzip.compress(body, compresslevel=9))
+        brotli_s = best_of(lambda: brotli.compress(body, quality=4, mode=brotli.MODE_TEXT))
+        print(
+            f"{n:>9} {stdlib_s * 1000:>7.1f}ms {orjson_s * 1000:>7.1f}ms {stdlib_s / orjson_s:>7.1f}x"
+            f" {len(body) / 1024:>7.0f}KB"
+            f" {gzipped / 1024:>6.0f}KB {gzip_s * 1000:>6.1f}ms"
+            f" {brotlied / 1024:>6.0f}KB {brotli_s * 1000:>6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
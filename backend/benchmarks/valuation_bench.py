@@ -0,0 +1,30 @@
+"""Benchmark list-endpoint valuation: per-account loop vs. valuation.value_accounts.
+
+Run from backend/:  python -m benchmarks.valuation_bench
+"""
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks._common import Prices, best_of, make_accounts  # noqa: E402
+from valuation import calculate_account_usd, value_accounts  # noqa: E402
+
+
+def main():
+    random.seed(42)
+    prices = Prices()
+    print(f"{'accounts':>9} {'per-account':>12} {'vectorized':>11} {'speedup':>8}")
+    for n in (10_000, 100_000):
+        accounts = make_accounts(n)
+        looped = [calculate_account_usd(account, prices) for account in accounts]
+        assert looped == value_accounts(accounts, prices)
+
+        loop_s = best_of(lambda: [calculate_account_usd(account, prices) for account in accounts])
+        vector_s = best_of(lambda: value_accounts(accounts, prices))
+        print(f"{n:>9} {loop_s * 1000:>10.1f}ms {vector_s * 1000:>9.1f}ms {loop_s / vector_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark account write latency: find/update/find vs. find_one_and_update.
+
+Needs a reachable MongoDB (a local `docker run -p 27017:27017 mongo` will do);
+without MONGO_URL, or when the server does not answer, it says so and skips.
+Uses a throwaway collection in DB_NAME (default "bench"), dropped at the end.
+Run from backend/:  MONGO_URL=mongodb://localhost:27017 python -m benchmarks.write_path_bench
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+ITERATIONS = 500
+
+
+async def legacy_update(collection, account_id, changes):
+    existing = await collection.find_one({"id": account_id}, {"_id": 0})
+    if not existing:
+        return None
+    await collection.update_one({"id": account_id}, {"$set": changes})
+    return await collection.find_one({"id": account_id}, {"_id": 0})
+
+
+async def single_round_trip_update(collection, account_id, changes):
+    return await collection.find_one_and_update(
+        {"id": account_id},
+        {"$set": changes},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def measure(fn, collection, account_id):
+    timings = []
+    for i in range(ITERATIONS):
+        started = time.perf_counter()
+        await fn(collection, account_id, {"gold": i})
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+async def main():
+    mongo_url = os.environ.get("MONGO_URL")
+    if not mongo_url:
+        print("write_path_bench needs a MongoDB: set MONGO_URL (and optionally DB_NAME); skipping", file=sys.stderr)
+        return
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=3000)
+    try:
+        await client.admin.command("ping")
+    except PyMongoError as e:
+        client.close()
+        print(f"write_path_bench: MongoDB at MONGO_URL is unreachable ({e.__class__.__name__}); skipping", file=sys.stderr)
+        return
+    
+    collection = client[os.environ.get("DB_NAME", "bench")][f"bench_write_path_{uuid.uuid4().hex[:8]}"]
+    try:
+        await collection.create_index("id", unique=True)
+        account_id = str(uuid.uuid4())
+        await collection.insert_one({"id": account_id, "name": "bench", "gold": 0})
+
+        print(f"{'write path':<28} {'p50':>8} {'p99':>8}")
+        for name, fn in (("find + update + find", legacy_update),
+                         ("find_one_and_update", single_round_trip_update)):
+            p50, p99 = await measure(fn, collection, account_id)
+            print(f"{name:<28} {p50:>6.2f}ms {p99:>6.2f}ms")
+    finally:
+        await collection.drop()
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
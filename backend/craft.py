@@ -0,0 +1,273 @@
+"""Legendary craft engine (Raro -> Épico -> Lendário) for account materials.
+
+Server-side port of the craft math in frontend/src/pages/AccountResources.js
+(calculateCraftableLegendary, calculateObjectiveWithCraft and
+calculateResourceDeficit), evaluated for many accounts at once with NumPy,
+plus optimize_craft(), which shares one resource pool across all objectives.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+# Materiais na ordem fixa
+MATERIALS = (
+    ("anima", "Anima"),
+    ("bugiganga", "Bugiganga"),
+    ("lunar", "Lunar"),
+    ("iluminado", "Iluminado"),
+    ("quintessencia", "Quintessência"),
+    ("esfera", "Esfera"),
+    ("platina", "Platina"),
+    ("aco", "Aço"),
+)
+MATERIAL_KEYS = tuple(key for key, _ in MATERIALS)
+MATERIAL_NAMES = dict(MATERIALS)
+RARITIES = ("raro", "epico", "lendario")
+RESOURCES = ("po", "ds", "cobre")
+
+# Custos de craft: 1 épico = 10 raros + recursos, 1 lendário = 10 épicos + recursos
+CRAFT_COSTS = {
+    "epico": {"raro": 10, "po": 25, "ds": 5000, "cobre": 20000},
+    "lendario": {"epico": 10, "po": 125, "ds": 25000, "cobre": 100000},
+}
+
+# Receitas dos objetivos lendários: (material, lendários necessários)
+OBJECTIVES = {
+    "arma": {"name": "Arma Lendária", "ingredients": (("aco", 300), ("esfera", 100), ("lunar", 100))},
+    "torso": {"name": "Torso Lendário", "ingredients": (("aco", 300), ("quintessencia", 100), ("bugiganga", 100))},
+    "colar": {"name": "Colar Lendário", "ingredients": (("platina", 300), ("iluminado", 100), ("anima", 100))},
+}
+
+
+def craft_arrays(accounts: List[dict]):
+    """Materials as an (accounts, materials, rarities) array and resources as (accounts, resources)"""
+    n = len(accounts)
+    materials = np.fromiter(
+        (
+            ((account.get("materials") or {}).get(material) or {}).get(rarity, 0)
+            for account in accounts for material in MATERIAL_KEYS for rarity in RARITIES
+        ),
+        dtype=np.int64,
+        count=n * len(MATERIAL_KEYS) * len(RARITIES)
+    ).reshape(n, len(MATERIAL_KEYS), len(RARITIES))
+    resources = np.fromiter(
+        ((account.get("craft_resources") or {}).get(resource, 0) for account in accounts for resource in RESOURCES),
+        dtype=np.int64,
+        count=n * len(RESOURCES)
+    ).reshape(n, len(RESOURCES))
+    return materials, resources
+
+
+def _craft_step(available: np.ndarray, pools: np.ndarray, costs: dict, source: str):
+    """How many items each account can craft from `available` source items and the resource pools"""
+    limits = [available // costs[source]] + [pools[:, i] // costs[r] for i, r in enumerate(RESOURCES)]
+    crafted = np.minimum.reduce(limits)
+    spent = np.stack([crafted * costs[r] for r in RESOURCES], axis=1)
+    return crafted, pools - spent
+
+
+def craftable_legendary(material: np.ndarray, pools: np.ndarray):
+    """Chain-craft one material (raro -> épico -> lendário) for every account.
+
+    `material` is (accounts, rarities), `pools` is (accounts, resources).
+    Returns total lendários, the remaining pools and how many épicos and
+    lendários were crafted.
+    """
+    epicos, pools = _craft_step(material[:, 0], pools, CRAFT_COSTS["epico"], "raro")
+    lendarios, pools = _craft_step(material[:, 1] + epicos, pools, CRAFT_COSTS["lendario"], "epico")
+    return material[:, 2] + lendarios, pools, epicos, lendarios
+
+
+def _resource_deficit(objective: dict, materials: np.ndarray, resources: np.ndarray) -> np.ndarray:
+    """Resources still missing to craft every missing lendário of an objective"""
+    needed = np.zeros_like(resources)
+    epico_costs = np.array([CRAFT_COSTS["epico"][r] for r in RESOURCES])
+    lendario_costs = np.array([CRAFT_COSTS["lendario"][r] for r in RESOURCES])
+    for material, required in objective["ingredients"]:
+        tiers = materials[:, MATERIAL_KEYS.index(material)]
+        lend_missing = np.maximum(0, required - tiers[:, 2])
+        epico_missing = np.maximum(0, lend_missing * CRAFT_COSTS["lendario"]["epico"] - tiers[:, 1])
+        needed += epico_missing[:, None] * epico_costs + lend_missing[:, None] * lendario_costs
+    return np.maximum(0, needed - resources)
+
+
+def _percentage(progress: float) -> int:
+    # Math.round semantics (half up), as shown by the frontend
+    return int(np.floor(progress * 100 + 0.5))
+
+
+def evaluate_craft(accounts: List[dict]) -> List[Dict]:
+    """Craft progress of every objective for every account, in one vectorized pass.
+
+    Each objective consumes ingredients in recipe order from its own copy of
+    the account's craft resources, exactly like the dashboard does.
+    """
+    if not accounts:
+        return []
+    materials, resources = craft_arrays(accounts)
+    results = [{"objectives": {}} for _ in accounts]
+
+    for objective_key, objective in OBJECTIVES.items():
+        pools = resources.copy()
+        ingredients = []
+        for material, required in objective["ingredients"]:
+            have, pools, epicos, lendarios = craftable_legendary(
+                materials[:, MATERIAL_KEYS.index(material)], pools
+            )
+            ingredients.append((material, required, have.tolist(), epicos.tolist(), lendarios.tolist()))
+        remaining = np.maximum(0, pools).tolist()
+        bottleneck = (pools < 0).tolist()
+        deficit = _resource_deficit(objective, materials, resources).tolist()
+
+        for i, result in enumerate(results):
+            ingredient_results = []
+            for material, required, have, epicos, lendarios in ingredients:
+                ingredient_results.append({
+                    "key": material,
+                    "name": MATERIAL_NAMES[material],
+                    "required": required,
+                    "have": have[i],
+                    "missing": max(0, required - have[i]),
+                    "progress": min(1.0, have[i] / required),
+                    "craft_details": {"epicos_craftados": epicos[i], "lend_craftados": lendarios[i]},
+                })
+            progress = min(ingredient["progress"] for ingredient in ingredient_results)
+            result["objectives"][objective_key] = {
+                "name": objective["name"],
+                "progress": progress,
+                "percentage": _percentage(progress),
+                "ingredients": ingredient_results,
+                "remaining_resources": dict(zip(RESOURCES, remaining[i])),
+                "resource_bottleneck": dict(zip(RESOURCES, bottleneck[i])),
+                "deficit": dict(zip(RESOURCES, deficit[i])),
+            }
+
+    for result in results:
+        # Objetivo mais próximo: maior percentual, o primeiro vence empates
+        result["closest"] = max(OBJECTIVES, key=lambda key: result["objectives"][key]["percentage"])
+    return results
+
+
+def _account_tiers(account: dict) -> Dict[str, Dict[str, int]]:
+    materials = account.get("materials") or {}
+    return {
+        material: {rarity: (materials.get(material) or {}).get(rarity, 0) for rarity in RARITIES}
+        for material in MATERIAL_KEYS
+    }
+
+
+def _plan_crafts(tiers: Dict[str, Dict[str, int]], needs: Dict[str, int]):
+    """Minimal crafts that bring every material up to `needs` lendários.
+
+    Returns the craft steps, the resources they consume and how many raros
+    are missing (crafting only what is needed is always optimal, since
+    every craft only consumes).
+    """
+    steps = []
+    consumed = dict.fromkeys(RESOURCES, 0)
+    raro_missing = {}
+    for material in MATERIAL_KEYS:
+        lendarios = max(0, needs.get(material, 0) - tiers[material]["lendario"])
+        if not lendarios:
+            continue
+        epicos = max(0, lendarios * CRAFT_COSTS["lendario"]["epico"] - tiers[material]["epico"])
+        shortfall = epicos * CRAFT_COSTS["epico"]["raro"] - tiers[material]["raro"]
+        if shortfall > 0:
+            raro_missing[material] = shortfall
+        for rarity, quantity in (("epico", epicos), ("lendario", lendarios)):
+            if not quantity:
+                continue
+            cost = {component: amount * quantity for component, amount in CRAFT_COSTS[rarity].items()}
+            for resource in RESOURCES:
+                consumed[resource] += cost[resource]
+            steps.append({"material": material, "rarity": rarity, "quantity": quantity, "cost": cost})
+    return steps, consumed, raro_missing
+
+
+def _objective_needs(objective_keys) -> Dict[str, int]:
+    needs: Dict[str, int] = {}
+    for key in objective_keys:
+        for material, required in OBJECTIVES[key]["ingredients"]:
+            needs[material] = needs.get(material, 0) + required
+    return needs
+
+
+def optimize_craft(account: dict) -> Dict:
+    """Allocate shared craft resources across objectives to complete as many as possible.
+
+    Unlike evaluate_craft, materials and po/ds/cobre are a single pool shared
+    by all objectives (Arma and Torso together need 600 Aço L). With three
+    objectives the search is exact: every subset is checked for feasibility
+    against the minimal craft plan it requires. Ties are broken by fewer
+    resources consumed, then by objective order.
+    """
+    tiers = _account_tiers(account)
+    pools = {resource: (account.get("craft_resources") or {}).get(resource, 0) for resource in RESOURCES}
+    keys = list(OBJECTIVES)
+
+    best = None
+    for mask in range(1 << len(keys)):
+        chosen = [key for i, key in enumerate(keys) if mask & (1 << i)]
+        steps, consumed, raro_missing = _plan_crafts(tiers, _objective_needs(chosen))
+        if raro_missing or any(consumed[r] > pools[r] for r in RESOURCES):
+            continue
+        # Normalized resource usage, so one cheap resource does not dominate
+        usage = sum(consumed[r] / CRAFT_COSTS["epico"][r] for r in RESOURCES)
+        rank = (-len(chosen), usage, mask)
+        if best is None or rank < best[0]:
+            best = (rank, chosen, steps, consumed)
+
+    _, chosen, steps, consumed = best
+    remaining = {r: pools[r] - consumed[r] for r in RESOURCES}
+
+    # What each objective left out would still need on top of the plan
+    missing = {}
+    for key in keys:
+        if key in chosen:
+            continue
+        _, extra, raro_missing = _plan_crafts(tiers, _objective_needs(chosen + [key]))
+        missing[key] = {
+            "raro": raro_missing,
+            "resources": {r: max(0, extra[r] - pools[r]) for r in RESOURCES},
+        }
+
+    return {
+        "completed": chosen,
+        "steps": steps,
+        "consumed": consumed,
+        "remaining_resources": remaining,
+        "missing": missing,
+    }
+
+
+def summarize_craft(accounts: List[dict]) -> List[Dict]:
+    """Compact craft status persisted on each account as `craft_summary`.
+
+    Holds the lendários reachable per material (each material using the full
+    resource pool), every objective's progress and deficit, the resources
+    that bottleneck it and the closest objective.
+    """
+    if not accounts:
+        return []
+    materials, resources = craft_arrays(accounts)
+    craftable = {
+        material: craftable_legendary(materials[:, i], resources)[0].tolist()
+        for i, material in enumerate(MATERIAL_KEYS)
+    }
+
+    summaries = []
+    for i, result in enumerate(evaluate_craft(accounts)):
+        objectives = {}
+        for key, objective in result["objectives"].items():
+            objectives[key] = {
+                "progress": objective["progress"],
+                "percentage": objective["percentage"],
+                "deficit": objective["deficit"],
+                "bottleneck": [r for r in RESOURCES if objective["deficit"][r] > 0],
+            }
+        summaries.append({
+            "craftable": {material: craftable[material][i] for material in MATERIAL_KEYS},
+            "objectives": objectives,
+            "closest": result["closest"],
+        })
+    return summaries
@@ -0,0 +1,91 @@
+"""In-process fan-out of account change events to connected dashboards (SSE)."""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def diff_documents(before: dict, after: dict, prefix: str = "") -> Dict[str, Any]:
+    """Changed leaves between two documents, keyed by dotted path (removed keys map to None)"""
+    changes = {}
+    for key in before.keys() | after.keys():
+        path = f"{prefix}{key}"
+        old, new = before.get(key), after.get(key)
+        if isinstance(old, dict) and isinstance(new, dict):
+            changes.update(diff_documents(old, new, f"{path}."))
+        elif old != new:
+            changes[path] = new
+    return changes
+
+
+class Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.evicted = False
+
+
+class ChangeHub:
+    """Broadcasts events to every subscriber through a bounded queue each.
+
+    publish() never blocks: a subscriber whose queue is full is evicted, its
+    backlog dropped and replaced by a single "evicted" event telling the
+    client to reload and reconnect.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.evictions = 0
+        self._subscribers: Set[Subscriber] = set()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def publish(self, event: dict):
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+        subscriber.evicted = True
+        self.evictions += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait({"type": "evicted"})
+        logger.warning("Evicted slow event stream subscriber")
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "queue_size": self.queue_size,
+            "evictions": self.evictions
+        }
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def format_sse(event: dict, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event, separators=(',', ':'), default=_json_default)}")
+    return "\n".join(lines) + "\n\n"
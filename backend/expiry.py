@@ -0,0 +1,117 @@
+"""Precise confirmation expiry: sleep until the next reset_at instead of polling.
+
+ExpiryScheduler keeps a min-heap of (reset_at, account id) for the confirmed
+accounts, loaded at startup from an indexed query and kept current by the
+account writes. A single task sleeps until the earliest deadline, hands the
+due ids to the reset callback and goes back to sleep; a write with an
+earlier deadline wakes it to re-arm.
+
+Entries are never removed from the middle of the heap: a re-confirmed or
+unconfirmed account leaves a stale entry behind, skipped when it reaches the
+top because it no longer matches the account's current deadline.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiryScheduler:
+    def __init__(self, reset_due: Callable[[List[str], datetime], Awaitable[int]],
+                 retry_after: timedelta = timedelta(minutes=1)):
+        self._reset_due = reset_due
+        self._retry_after = retry_after
+        self._heap: List[Tuple[datetime, str]] = []
+        self._deadlines: Dict[str, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def load(self, entries: Iterable[Tuple[str, datetime]]):
+        """Replace every deadline with (account id, reset_at) pairs"""
+        self._deadlines = dict(entries)
+        self._heap = [(reset_at, account_id) for account_id, reset_at in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def schedule(self, account_id: str, reset_at: Optional[datetime]):
+        """Set (or with None, clear) the deadline of one account"""
+        if reset_at is None:
+            self._deadlines.pop(account_id, None)
+            return
+        if self._deadlines.get(account_id) == reset_at:
+            return
+        self._deadlines[account_id] = reset_at
+        heapq.heappush(self._heap, (reset_at, account_id))
+        if self._heap[0] == (reset_at, account_id):
+            self._wakeup.set()
+
+    def next_deadline(self) -> Optional[datetime]:
+        while self._heap:
+            reset_at, account_id = self._heap[0]
+            if self._deadlines.get(account_id) == reset_at:
+                return reset_at
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: datetime) -> List[str]:
+        due = []
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, account_id = heapq.heappop(self._heap)
+            del self._deadlines[account_id]
+            due.append(account_id)
+        return due
+
+    def stats(self) -> dict:
+        deadline = self.next_deadline()
+        return {
+            "running": self.running,
+            "pending": len(self._deadlines),
+            "next_reset_at": deadline.isoformat() if deadline else None
+        }
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            timeout = None
+            if deadline is not None:
+                timeout = max((deadline - datetime.now(timezone.utc)).total_seconds(), 0)
+            try:
+                # A new earliest deadline (or a reload) interrupts the sleep
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            now = datetime.now(timezone.utc)
+            due = self.pop_due(now)
+            if not due:
+                continue
+            try:
+                reset_count = await self._reset_due(due, now)
+                logger.info(f"Expiry reset {reset_count} of {len(due)} due account(s)")
+            except Exception as e:
+                logger.error(f"Error resetting expired accounts: {e}")
+                retry_at = now + self._retry_after
+                for account_id in due:
+                    self.schedule(account_id, retry_at)
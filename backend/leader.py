@@ -0,0 +1,114 @@
+"""Lease-based leader election over a Mongo document, one leader per deployment.
+
+Every worker runs a LeaderLease loop. The lease is a single document
+{id, holder, expires_at}: a worker takes it when it is free or expired and
+renews it every ttl/3 while it holds it. Taking it is one upsert filtered on
+"held by me or expired"; when another worker holds a live lease the filter
+misses, the upsert collides with the unique id index and the attempt fails.
+
+A leader that cannot renew before its lease runs out steps down, so two
+workers never believe they lead for longer than the clock skew between them.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    def __init__(self, name: str, ttl: timedelta,
+                 on_elected: Callable[[], Awaitable[None]], on_demoted: Callable[[], Awaitable[None]]):
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.expires_at: Optional[datetime] = None
+        self.elections = 0
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._collection = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def try_acquire(self) -> bool:
+        """Take or renew the lease; True while this worker holds it"""
+        now = datetime.now(timezone.utc)
+        try:
+            lease = await self._collection.find_one_and_update(
+                {"id": self.name, "$or": [{"holder": self.holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": self.holder, "expires_at": now + self.ttl, "renewed_at": now}},
+                projection={"_id": 0},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Held by another worker and not expired
+            return False
+        self.expires_at = lease["expires_at"]
+        return lease["holder"] == self.holder
+
+    async def release(self):
+        await self._collection.delete_one({"id": self.name, "holder": self.holder})
+
+    def start(self, collection):
+        self._collection = collection
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop campaigning; a leader steps down and frees the lease for the others"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            logger.info(f"{self.holder} is giving up the {self.name} lease")
+            await self._set_leader(False)
+            try:
+                await self.release()
+            except Exception as e:
+                logger.error(f"Error releasing {self.name} lease: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "lease_expires_at": self.expires_at.isoformat() if self.is_leader and self.expires_at else None,
+            "elections": self.elections
+        }
+
+    async def _set_leader(self, is_leader: bool):
+        self.is_leader = is_leader
+        if is_leader:
+            self.elections += 1
+        callback = self._on_elected if is_leader else self._on_demoted
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Error handling {self.name} leadership change: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                acquired = await self.try_acquire()
+            except Exception as e:
+                logger.error(f"Error renewing {self.name} lease: {e}")
+                # Keep leading only as long as the last renewal lasts
+                acquired = self.is_leader and datetime.now(timezone.utc) < self.expires_at
+            if acquired != self.is_leader:
+                if acquired:
+                    logger.info(f"{self.holder} took the {self.name} lease")
+                else:
+                    logger.warning(f"{self.holder} lost the {self.name} lease")
+                await self._set_leader(acquired)
+            await asyncio.sleep(self.ttl.total_seconds() / 3)
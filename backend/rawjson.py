@@ -0,0 +1,66 @@
+"""Opt-in raw read path: accounts go from BSON to JSON without becoming dicts.
+
+An aggregation shapes every account the way the API returns it (no _id,
+ISO date strings) under an `account` key, next to the boss counts its
+value is computed from. The cursor yields RawBSONDocuments: only the small
+`counts` sub-document is decoded for valuation, python-bsonjs turns the
+account bytes straight into JSON and total_usd is spliced into the object.
+
+This allocates about a third less per account than the default path but
+costs more CPU (bsonjs is slower than C decoding plus orjson), see
+benchmarks/raw_read_bench.py; hence opt-in, for memory-bound workers.
+"""
+from typing import Iterable, List, Optional
+
+import bson
+import bsonjs
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+from valuation import BOSS_GROUPS, value_accounts
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+
+def iso_date(field: str) -> dict:
+    """BSON date as datetime.isoformat() writes it for UTC; other values pass through"""
+    value = f"${field}"
+    return {"$cond": [
+        {"$eq": [{"$type": value}, "date"]},
+        {"$dateToString": {
+            "date": value,
+            # isoformat() leaves out the fraction when it is zero
+            "format": {"$cond": [
+                {"$eq": [{"$millisecond": value}, 0]},
+                "%Y-%m-%dT%H:%M:%S+00:00",
+                "%Y-%m-%dT%H:%M:%S.%L000+00:00",
+            ]},
+        }},
+        value,
+    ]}
+
+
+def raw_account_pipeline(query: dict, fields: Iterable[str], date_fields: Iterable[str],
+                         sort: Optional[list] = None, limit: int = 0) -> List[dict]:
+    date_fields = set(date_fields)
+    pipeline = [{"$match": query}]
+    if sort:
+        pipeline.append({"$sort": dict(sort)})
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": {
+        "_id": 0,
+        "account": {field: iso_date(field) if field in date_fields else f"${field}" for field in fields},
+        "counts": {group: f"${group}" for group in BOSS_GROUPS},
+    }})
+    return pipeline
+
+
+def raw_account_json(documents: List[RawBSONDocument], prices) -> List[bytes]:
+    """JSON objects of a chunk of shaped accounts, each with its total_usd"""
+    # One C decode per account for the boss counts; lookups on RawBSONDocument are pure Python
+    counts = [bson.decode(document["counts"].raw) for document in documents]
+    return [
+        b"%s, \"total_usd\" : %r }" % (bsonjs.dumps(document["account"].raw)[:-1].rstrip().encode(), total)
+        for document, total in zip(documents, value_accounts(counts, prices))
+    ]
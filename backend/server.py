@@ -1,18 +1,39 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Body, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
+from starlette.datastructures import MutableHeaders
 from starlette.middleware.cors import CORSMiddleware
+from brotli_asgi import BrotliMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
 import os
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, Dict
+from pydantic import BaseModel, Field, ConfigDict, create_model, model_validator
+from typing import Annotated, Optional, Dict, List, Tuple
 import uuid
 from datetime import datetime, timezone, timedelta
 from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 import asyncio
+import copy
+import hashlib
 import logging
+import re
+import time
+
+import orjson
+
+from events import ChangeHub, diff_documents, format_sse
+from expiry import ExpiryScheduler
+from leader import LeaderLease
+from rawjson import RAW_CODEC_OPTIONS, raw_account_json, raw_account_pipeline
+from craft import OBJECTIVES, evaluate_craft, optimize_craft, summarize_craft
+from valuation import (
+    BOSS_CATALOG, BOSS_GROUPS, calculate_account_usd, tiers_in_group, value_accounts,
+    value_accounts_by_profile, usd_expression
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,100 +44,198 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware so BSON dates come back as UTC-aware datetimes
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # Scheduler instance
 scheduler = AsyncIOScheduler()
 
-async def scheduled_reset_job():
-    """Background job to reset confirmed accounts after 30 days"""
-    logger.info("Running scheduled reset job...")
+# Confirmed accounts are reset this long after confirmation
+RESET_AFTER = timedelta(days=30)
+
+# Account fields stored as BSON dates and emitted as ISO strings by the API
+ACCOUNT_DATE_FIELDS = ("confirmed_at", "created_at", "reset_at")
+DATE_MIGRATION_ID = "account_dates_to_bson"
+
+# A pending updated_seq older than this belongs to a writer that died mid-write
+ACCOUNT_WRITE_TIMEOUT = timedelta(seconds=30)
+# Deletion tombstones are kept this long for /accounts/changes clients to catch up
+TOMBSTONE_RETENTION = timedelta(days=int(os.environ.get('TOMBSTONE_RETENTION_DAYS', '30')))
+
+# Account listing: max page size for keyset pagination, and cursor chunk size
+ACCOUNT_PAGE_MAX = 1000
+ACCOUNT_CHUNK_SIZE = 500
+
+# Fields the craft engine needs from an account
+CRAFT_PROJECTION = {"_id": 0, "id": 1, "name": 1, "materials": 1, "craft_resources": 1, "updated_seq": 1}
+# Updates touching these fields invalidate the persisted craft_summary
+CRAFT_INPUT_FIELDS = ("materials", "craft_resources")
+# Lean account views; total_usd is always returned (bosses are read to compute it)
+ACCOUNT_VIEWS = {
+    "dashboard": ("id", "name", "bosses", "special_bosses", "sala_pico", "gold", "confirmed", "confirmed_at", "updated_seq"),
+}
+
+# Indexes required by the account routes and the reset job, per collection
+INDEX_SPECS = {
+    "accounts": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        ([("confirmed", ASCENDING), ("reset_at", ASCENDING)], {"name": "confirmed_reset_at"}),
+        ([("updated_seq", ASCENDING)], {"name": "updated_seq"}),
+        ([("total_usd", ASCENDING), ("id", ASCENDING)], {"name": "total_usd_id"}),
+    ],
+    "account_tombstones": [
+        ([("updated_seq", ASCENDING)], {"name": "updated_seq"}),
+        ([("deleted_at", ASCENDING)], {"name": "deleted_at"}),
+    ],
+    "boss_prices": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+    ],
+    # Also what makes concurrent lease takeovers fail instead of both inserting
+    "scheduler_leases": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+    ],
+}
+
+# Indexes nothing queries any more, dropped so writes stop maintaining them
+OBSOLETE_INDEXES = {
+    "accounts": ["confirmed_confirmed_at"],  # the reset job now uses confirmed_reset_at
+}
+
+# Result of the last ensure_indexes() run
+index_report: Dict[str, dict] = {}
+
+async def ensure_indexes() -> Dict[str, dict]:
+    """Create (idempotently) and verify the indexes in INDEX_SPECS, and drop OBSOLETE_INDEXES"""
+    report = {}
+    for collection_name, specs in INDEX_SPECS.items():
+        collection = db[collection_name]
+        started = time.perf_counter()
+        errors = []
+        obsolete = set(OBSOLETE_INDEXES.get(collection_name, ())) & set(await collection.index_information())
+        for name in obsolete:
+            try:
+                await collection.drop_index(name)
+                logger.info(f"Dropped obsolete index {collection_name}.{name}")
+            except OperationFailure as e:
+                errors.append(f"{name}: {e}")
+                logger.error(f"Could not drop index {collection_name}.{name}: {e}")
+        for keys, options in specs:
+            try:
+                await collection.create_index(keys, **options)
+            except OperationFailure as e:
+                # e.g. duplicate ids prevent a unique index; keep serving without it
+                errors.append(f"{options['name']}: {e}")
+                logger.error(f"Could not create index {collection_name}.{options['name']}: {e}")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        existing = await collection.index_information()
+        missing = [options["name"] for _, options in specs if options["name"] not in existing]
+        report[collection_name] = {
+            "indexes": sorted(existing.keys()),
+            "missing": missing,
+            "errors": errors,
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+        logger.info(
+            f"Indexes on {collection_name}: {sorted(existing.keys())} "
+            f"(ensured in {elapsed_ms:.1f} ms, missing: {missing or 'none'})"
+        )
+
+    index_report.clear()
+    index_report.update(report)
+    return report
+
+# Background work (scheduled jobs, expiry resets, migrations) runs in the lease holder only
+LEADER_LEASE_TTL = timedelta(seconds=int(os.environ.get('LEADER_LEASE_SECONDS', '30')))
+# How often the leader picks up deadlines set by the other workers, and how far ahead
+EXPIRY_SYNC_INTERVAL = timedelta(minutes=5)
+leader_tasks: List[asyncio.Task] = []
+
+async def leader_startup_jobs():
+    """Convert legacy string dates, then arm the expiry scheduler (missed resets fire at once)"""
     try:
-        now = datetime.now(timezone.utc)
-        thirty_days_ago = now - timedelta(days=30)
-        
-        accounts = await db.accounts.find({
-            "confirmed": True,
-            "confirmed_at": {"$ne": None}
-        }).to_list(1000)
-        
-        reset_count = 0
-        for account in accounts:
-            confirmed_at_str = account.get('confirmed_at')
-            if confirmed_at_str:
-                try:
-                    confirmed_at = datetime.fromisoformat(confirmed_at_str.replace('Z', '+00:00'))
-                    if confirmed_at < thirty_days_ago:
-                        await db.accounts.update_one(
-                            {"id": account['id']},
-                            {"$set": {
-                                "confirmed": False,
-                                "confirmed_at": None,
-                                "bosses": {
-                                    "medio2": 0, "grande2": 0,
-                                    "medio4": 0, "grande4": 0,
-                                    "medio6": 0, "grande6": 0,
-                                    "medio7": 0, "grande7": 0,
-                                    "medio8": 0, "grande8": 0
-                                },
-                                "special_bosses": {
-                                    "xama": 0, "praca_4f": 0, "cracha_epica": 0
-                                },
-                                "gold": 0
-                            }}
-                        )
-                        reset_count += 1
-                        logger.info(f"Reset account: {account.get('name', account['id'])}")
-                except Exception as e:
-                    logger.error(f"Error parsing date for account {account['id']}: {e}")
-        
-        logger.info(f"Scheduled reset complete. Reset {reset_count} account(s).")
+        await migrate_account_dates()
     except Exception as e:
-        logger.error(f"Error in scheduled reset job: {e}")
+        logger.error(f"Error migrating account dates: {e}")
+    try:
+        await backfill_updated_seq()
+    except Exception as e:
+        logger.error(f"Error stamping updated_seq: {e}")
+    try:
+        await backfill_craft_summaries()
+    except Exception as e:
+        logger.error(f"Error storing craft summaries: {e}")
+    try:
+        await backfill_reset_at()
+        await load_expiry_deadlines()
+    except Exception as e:
+        logger.error(f"Error loading confirmation deadlines: {e}")
+    expiry_scheduler.start()
+    # Also stores total_usd on accounts written before it was persisted
+    await scheduled_reconcile_job()
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Manage app lifecycle - start/stop scheduler"""
-    # Start scheduler on startup
+async def start_background_jobs():
     scheduler.add_job(
-        scheduled_reset_job,
-        IntervalTrigger(hours=6),  # Run every 6 hours
-        id="reset_confirmed_accounts",
+        scheduled_reconcile_job,
+        IntervalTrigger(hours=1),
+        id="reconcile_fleet_totals",
         replace_existing=True
     )
-    scheduler.start()
-    logger.info("Scheduler started - will check for expired confirmations every 6 hours")
+    scheduler.add_job(
+        scheduled_expiry_sync_job,
+        IntervalTrigger(seconds=EXPIRY_SYNC_INTERVAL.total_seconds()),
+        id="sync_expiry_deadlines",
+        replace_existing=True
+    )
+    # Not awaited: the lease must keep being renewed while migrations run
+    leader_tasks.append(asyncio.create_task(leader_startup_jobs()))
+    logger.info("Background jobs started on this worker")
+
+async def stop_background_jobs():
+    for task in leader_tasks:
+        task.cancel()
+    leader_tasks.clear()
+    for job_id in ("reconcile_fleet_totals", "sync_expiry_deadlines"):
+        if scheduler.get_job(job_id):
+            scheduler.remove_job(job_id)
+    await expiry_scheduler.stop()
+    logger.info("Background jobs stopped on this worker")
+
+leader_lease = LeaderLease("scheduler", LEADER_LEASE_TTL, start_background_jobs, stop_background_jobs)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage app lifecycle - start/stop scheduler"""
+    # Make sure lookups by id and the reset query are index-backed
+    await ensure_indexes()
     
-    # Run once on startup to catch any missed resets
-    asyncio.create_task(scheduled_reset_job())
+    # Every worker runs the scheduler; only the leader gets jobs
+    scheduler.start()
+    leader_lease.start(db.scheduler_leases)
+    logger.info(f"Scheduler started, campaigning for the lease as {leader_lease.holder}")
     
     yield
     
-    # Shutdown scheduler
+    # Step down first so another worker can take over right away
+    await leader_lease.stop()
     scheduler.shutdown()
     logger.info("Scheduler stopped")
 
 app = FastAPI(lifespan=lifespan)
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
 
 # Models
-class BossQuantities(BaseModel):
-    medio2: int = Field(default=0, ge=0)
-    grande2: int = Field(default=0, ge=0)
-    medio4: int = Field(default=0, ge=0)
-    grande4: int = Field(default=0, ge=0)
-    medio6: int = Field(default=0, ge=0)
-    grande6: int = Field(default=0, ge=0)
-    medio7: int = Field(default=0, ge=0)
-    grande7: int = Field(default=0, ge=0)
-    medio8: int = Field(default=0, ge=0)
-    grande8: int = Field(default=0, ge=0)
-
-class SpecialBosses(BaseModel):
-    xama: int = Field(default=0, ge=0)
-    praca_4f: int = Field(default=0, ge=0)
-    cracha_epica: int = Field(default=0, ge=0)
+# Boss counters and prices are generated from the boss catalog in valuation.py
+BossQuantities = create_model(
+    "BossQuantities",
+    **{tier.key: (int, Field(default=0, ge=0)) for tier in tiers_in_group("bosses")}
+)
+
+SpecialBosses = create_model(
+    "SpecialBosses",
+    **{tier.key: (int, Field(default=0, ge=0)) for tier in tiers_in_group("special_bosses")}
+)
 
 class MaterialTier(BaseModel):
     """Quantidade de um material por raridade"""
@@ -153,8 +272,13 @@ class Account(BaseModel):
     craft_resources: CraftResources = Field(default_factory=CraftResources)
     gold: float = Field(default=0, ge=0)
     confirmed: bool = False
-    confirmed_at: Optional[str] = None
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    confirmed_at: Optional[datetime] = None
+    # confirmed_at + RESET_AFTER, when the confirmation expires
+    reset_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# Top-level fields a read may ask for with ?fields=
+ACCOUNT_READ_FIELDS = (*Account.model_fields, "craft_summary", "updated_seq")
 
 class AccountCreate(BaseModel):
     name: str
@@ -175,107 +299,924 @@ class AccountUpdate(BaseModel):
     gold: Optional[float] = Field(default=None, ge=0)
     confirmed: Optional[bool] = None
 
-class BossPrices(BaseModel):
-    model_config = ConfigDict(extra="ignore")
+def leaf_fields(model, prefix: str = ""):
+    """(dotted path, field) for every scalar field of a model, nested models flattened"""
+    for name, field in model.model_fields.items():
+        if isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel):
+            yield from leaf_fields(field.annotation, f"{prefix}{name}.")
+        else:
+            yield f"{prefix}{name}", field
+
+# Paths an account edit may target: the leaves of every AccountUpdate field
+ACCOUNT_EDIT_PATHS = {
+    path: field for path, field in leaf_fields(Account)
+    if path.split(".")[0] in AccountUpdate.model_fields
+}
+
+def constrained(field):
+    """A field's type together with its constraints (ge=0 and the like)"""
+    return Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation
+
+# {"bosses.medio6": 3, "gold": 10}; values keep the field's own validation
+AccountFieldSet = create_model(
+    "AccountFieldSet",
+    __config__=ConfigDict(extra="forbid"),
+    **{
+        path.replace(".", "__"): (constrained(field), Field(default=None, alias=path))
+        for path, field in ACCOUNT_EDIT_PATHS.items()
+    }
+)
+
+# {"bosses.grande4": 1}; only numeric fields, negative amounts decrement
+AccountFieldInc = create_model(
+    "AccountFieldInc",
+    __config__=ConfigDict(extra="forbid"),
+    **{
+        path.replace(".", "__"): (field.annotation, Field(default=None, alias=path))
+        for path, field in ACCOUNT_EDIT_PATHS.items() if field.annotation in (int, float)
+    }
+)
+
+class AccountPatch(BaseModel):
+    """Field-level edit of PATCH /accounts/{id}, translated into targeted $set/$inc"""
+    model_config = ConfigDict(extra="forbid")
+    
+    set: AccountFieldSet = Field(default_factory=AccountFieldSet)
+    inc: AccountFieldInc = Field(default_factory=AccountFieldInc)
     
-    id: str = "default"
-    medio2_price: float = Field(default=0.045, ge=0)
-    grande2_price: float = Field(default=0.09, ge=0)
-    medio4_price: float = Field(default=0.14, ge=0)
-    grande4_price: float = Field(default=0.18, ge=0)
-    medio6_price: float = Field(default=0.36, ge=0)
-    grande6_price: float = Field(default=0.45, ge=0)
-    medio7_price: float = Field(default=0, ge=0)
-    grande7_price: float = Field(default=0, ge=0)
-    medio8_price: float = Field(default=0, ge=0)
-    grande8_price: float = Field(default=0, ge=0)
-    xama_price: float = Field(default=0, ge=0)
-    praca_4f_price: float = Field(default=0, ge=0)
-    cracha_epica_price: float = Field(default=0, ge=0)
-
-class BossPricesUpdate(BaseModel):
-    medio2_price: Optional[float] = Field(default=None, ge=0)
-    grande2_price: Optional[float] = Field(default=None, ge=0)
-    medio4_price: Optional[float] = Field(default=None, ge=0)
-    grande4_price: Optional[float] = Field(default=None, ge=0)
-    medio6_price: Optional[float] = Field(default=None, ge=0)
-    grande6_price: Optional[float] = Field(default=None, ge=0)
-    medio7_price: Optional[float] = Field(default=None, ge=0)
-    grande7_price: Optional[float] = Field(default=None, ge=0)
-    medio8_price: Optional[float] = Field(default=None, ge=0)
-    grande8_price: Optional[float] = Field(default=None, ge=0)
-    xama_price: Optional[float] = Field(default=None, ge=0)
-    praca_4f_price: Optional[float] = Field(default=None, ge=0)
-    cracha_epica_price: Optional[float] = Field(default=None, ge=0)
+    @model_validator(mode="after")
+    def check_conflicts(self):
+        both = self.set.model_fields_set & self.inc.model_fields_set
+        if both:
+            paths = ", ".join(sorted(AccountFieldSet.model_fields[name].alias for name in both))
+            raise ValueError(f"Fields both set and incremented: {paths}")
+        return self
+    
+    def operations(self) -> dict:
+        operations = {
+            "$set": self.set.model_dump(by_alias=True, exclude_unset=True),
+            "$inc": {path: amount for path, amount in self.inc.model_dump(by_alias=True, exclude_unset=True).items() if amount}
+        }
+        return {operator: fields for operator, fields in operations.items() if fields}
 
-# Helper functions
-def calculate_account_usd(account: dict, prices: BossPrices) -> float:
-    bosses = account.get('bosses', {})
-    special = account.get('special_bosses', {})
-    
-    total = 0.0
-    total += bosses.get('medio2', 0) * prices.medio2_price
-    total += bosses.get('grande2', 0) * prices.grande2_price
-    total += bosses.get('medio4', 0) * prices.medio4_price
-    total += bosses.get('grande4', 0) * prices.grande4_price
-    total += bosses.get('medio6', 0) * prices.medio6_price
-    total += bosses.get('grande6', 0) * prices.grande6_price
-    total += bosses.get('medio7', 0) * prices.medio7_price
-    total += bosses.get('grande7', 0) * prices.grande7_price
-    total += bosses.get('medio8', 0) * prices.medio8_price
-    total += bosses.get('grande8', 0) * prices.grande8_price
-    total += special.get('xama', 0) * prices.xama_price
-    total += special.get('praca_4f', 0) * prices.praca_4f_price
-    total += special.get('cracha_epica', 0) * prices.cracha_epica_price
-    
-    return round(total, 2)
+class AccountBulkEdit(BaseModel):
+    """One entry of PATCH /accounts/bulk"""
+    id: str
+    changes: AccountUpdate
 
-async def check_and_reset_accounts():
-    """Check accounts and reset those confirmed more than 30 days ago - called manually"""
-    now = datetime.now(timezone.utc)
-    thirty_days_ago = now - timedelta(days=30)
+BossPrices = create_model(
+    "BossPrices",
+    __config__=ConfigDict(extra="ignore"),
+    id=(str, "default"),
+    **{tier.price_field: (float, Field(default=tier.default_price, ge=0)) for tier in BOSS_CATALOG}
+)
+
+BossPricesUpdate = create_model(
+    "BossPricesUpdate",
+    **{tier.price_field: (Optional[float], Field(default=None, ge=0)) for tier in BOSS_CATALOG}
+)
+
+# Boss price cache
+class BossPricesCache:
+    """Process-local cache of the default BossPrices document.
+
+    update_boss_prices writes through with set(). A change made by another
+    process is picked up when a read endpoint observes a new boss_prices
+    version, or at the latest when the TTL expires. Cold loads are
+    single-flight: concurrent misses wait on one loader call.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._prices: Optional[BossPrices] = None
+        self._expires_at = 0.0
+        self._version: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._prices is not None and time.monotonic() < self._expires_at
+
+    async def get(self, loader) -> BossPrices:
+        if self._fresh():
+            self.hits += 1
+            return self._prices
+        async with self._lock:
+            # Another coroutine may have loaded while we waited for the lock
+            if self._fresh():
+                self.hits += 1
+                return self._prices
+            self.misses += 1
+            self.set(await loader())
+            return self._prices
+
+    def set(self, prices: BossPrices):
+        self._prices = prices
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self):
+        self._prices = None
+        self._expires_at = 0.0
+
+    def observe_version(self, version: int):
+        """Drop the cached prices when the stored version moved (e.g. written by another process)"""
+        if self._version is not None and version != self._version:
+            self.invalidate()
+        self._version = version
+
+    def stats(self) -> dict:
+        return {
+            "cached": self._fresh(),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+boss_prices_cache = BossPricesCache(ttl=float(os.environ.get('BOSS_PRICES_CACHE_TTL', '300')))
+
+async def load_boss_prices() -> BossPrices:
+    """Read the default price document, creating it with defaults if missing"""
+    # Upsert with $setOnInsert so concurrent first loads cannot create duplicates
+    prices = await db.boss_prices.find_one_and_update(
+        {"id": "default"},
+        {"$setOnInsert": BossPrices().model_dump()},
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return BossPrices(**prices)
+
+async def current_boss_prices() -> BossPrices:
+    """Boss prices used to value accounts (served from the in-process cache)"""
+    return await boss_prices_cache.get(load_boss_prices)
+
+async def observe_boss_prices_version():
+    """Drop the cached prices if the stored ones changed since they were loaded"""
+    versions = await read_versions("boss_prices")
+    boss_prices_cache.observe_version(versions["boss_prices"])
+
+# Named price profiles live next to "default" in boss_prices, keyed by id
+DEFAULT_PRICE_PROFILE = "default"
+PRICE_PROFILE_NAME = re.compile(r"^[a-z0-9_-]{1,40}$")
+
+def check_price_profile_name(profile: str):
+    if not PRICE_PROFILE_NAME.match(profile) or profile == "profiles":
+        raise HTTPException(status_code=400, detail="Invalid price profile name")
+
+async def save_price_profile(profile: str, update_data: dict) -> BossPrices:
+    """Upsert a price profile: the given prices are set, new profiles start from the defaults"""
+    defaults = {
+        key: value for key, value in BossPrices(id=profile).model_dump().items()
+        if key not in update_data
+    }
     
-    accounts = await db.accounts.find({
-        "confirmed": True,
-        "confirmed_at": {"$ne": None}
-    }).to_list(1000)
+    operations = {"$setOnInsert": defaults}
+    if update_data:
+        operations["$set"] = update_data
+    current_prices = await db.boss_prices.find_one_and_update(
+        {"id": profile},
+        operations,
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return BossPrices(**current_prices)
+
+async def load_price_profiles(names: Optional[List[str]] = None) -> List[BossPrices]:
+    """Price profiles by name (every profile when names is None), default first; unknown names raise 404"""
+    query = {"id": {"$in": names}} if names is not None else {}
+    docs = await db.boss_prices.find(query, {"_id": 0}).to_list(None)
+    profiles = {doc["id"]: BossPrices(**doc) for doc in docs}
+    if names is None or DEFAULT_PRICE_PROFILE in names:
+        profiles[DEFAULT_PRICE_PROFILE] = await current_boss_prices()
+    
+    missing = [name for name in names or [] if name not in profiles]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Price profile not found: {', '.join(missing)}")
+    return [profiles[name] for name in sorted(profiles, key=lambda name: (name != DEFAULT_PRICE_PROFILE, name))]
+
+# Live account change events, fanned out to /api/events subscribers of this process
+change_hub = ChangeHub(queue_size=int(os.environ.get('EVENTS_QUEUE_SIZE', '100')))
+EVENTS_HEARTBEAT_SECONDS = 15
+
+async def publish_account_update(before: dict, after: dict):
+    """Broadcast the per-field diff of an account write (plus its new total_usd)"""
+    if not change_hub.has_subscribers:
+        return
+    changes = diff_documents(before, after)
+    if not changes:
+        return
+    prices = await current_boss_prices()
+    total_usd = calculate_account_usd(after, prices)
+    if total_usd != calculate_account_usd(before, prices):
+        changes["total_usd"] = total_usd
+    change_hub.publish({"type": "updated", "id": after["id"], "seq": after.get("updated_seq"), "changes": changes})
+
+# Collection versions: bumped by every write, they drive the ETags of the read endpoints
+# (accounts use the account_seq counter, see read_versions)
+async def bump_version(name: str) -> int:
+    doc = await db.versions.find_one_and_update(
+        {"id": name},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["version"]
+
+async def read_versions(*names: str) -> Dict[str, object]:
+    """Current versions; "accounts" is derived from the account_seq counter and its in-flight seqs"""
+    ids = ["account_seq" if name == "accounts" else name for name in names]
+    docs = {doc["id"]: doc for doc in await db.versions.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))}
+    versions = {name: docs.get(name, {}).get("version", 0) for name in names}
+    if "accounts" in versions:
+        # Changes on allocation and again when each write lands
+        seq_doc = docs.get("account_seq")
+        versions["accounts"] = ".".join(map(str, [(seq_doc or {}).get("version", 0), *in_flight_seqs(seq_doc)]))
+    return versions
+
+async def next_account_seq() -> int:
+    """Allocate the updated_seq stamped on the next account write (or tombstone).
+
+    The seq is also recorded as pending in the same round trip; use it
+    through account_write(), which clears it once the write has landed.
+    """
+    doc = await db.versions.find_one_and_update(
+        {"id": "account_seq"},
+        [
+            {"$set": {"version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}}},
+            {"$set": {"pending": {"$concatArrays": [
+                {"$ifNull": ["$pending", []]},
+                [{"seq": "$version", "at": datetime.now(timezone.utc)}]
+            ]}}}
+        ],
+        projection={"_id": 0, "version": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["version"]
+
+class AccountWrite:
+    """An account write in flight: its seq, and the fleet totals change it lands with"""
+    def __init__(self, seq: int):
+        self.seq = seq
+        self.fleet_delta: Dict[str, float] = {}
+
+    def add_fleet_delta(self, delta: Dict[str, float]):
+        for path, value in delta.items():
+            self.fleet_delta[path] = self.fleet_delta.get(path, 0) + value
+
+@asynccontextmanager
+async def account_write():
+    """Hold a freshly allocated updated_seq in flight for the duration of the block.
+
+    Seqs are allocated before the write they stamp lands, so a reader could
+    see seq N+1 while N is still being written; the changes feed never
+    reports past the oldest seq still in flight (see account_feed_bounds).
+
+    The boss_prices version is checked alongside the allocation, so a write
+    valued with current_boss_prices() inside the block never uses prices
+    another process has already replaced.
+
+    The fleet totals live on the same counter document: the write's
+    add_fleet_delta() changes are applied by the update that clears its
+    seq, so totals and the accounts ETag settle together in one round trip.
+    """
+    seq, _ = await asyncio.gather(next_account_seq(), observe_boss_prices_version())
+    write = AccountWrite(seq)
+    try:
+        yield write
+    finally:
+        update = {"$pull": {"pending": {"seq": seq}}}
+        fleet = {f"fleet.{path}": value for path, value in write.fleet_delta.items() if value}
+        if fleet:
+            update["$inc"] = fleet
+        await db.versions.update_one({"id": "account_seq"}, update)
+
+def in_flight_seqs(doc: Optional[dict]) -> List[int]:
+    """Pending seqs of the account_seq counter, minus those of writers that died mid-write"""
+    cutoff = datetime.now(timezone.utc) - ACCOUNT_WRITE_TIMEOUT
+    return sorted(entry["seq"] for entry in (doc or {}).get("pending", []) if entry["at"] >= cutoff)
+
+async def account_feed_bounds() -> Tuple[int, int]:
+    """(highest seq whose tombstones were pruned, highest seq below which every account write has landed)"""
+    doc = await db.versions.find_one(
+        {"id": "account_seq"}, {"_id": 0, "version": 1, "pending": 1, "tombstones_pruned_seq": 1}
+    )
+    pending = in_flight_seqs(doc)
+    committed = pending[0] - 1 if pending else (doc or {}).get("version", 0)
+    return (doc or {}).get("tombstones_pruned_seq", 0), committed
+
+async def prune_tombstones() -> int:
+    """Delete tombstones older than TOMBSTONE_RETENTION; returns how many were deleted.
+
+    The highest pruned seq is recorded first, so a client asking for changes
+    since an older seq is told to resync instead of silently missing deletions.
+    """
+    cutoff = datetime.now(timezone.utc) - TOMBSTONE_RETENTION
+    newest = await db.account_tombstones.find(
+        {"deleted_at": {"$lt": cutoff}}, {"_id": 0, "updated_seq": 1}
+    ).sort("deleted_at", DESCENDING).limit(1).to_list(1)
+    if not newest:
+        return 0
+    pruned_seq = newest[0]["updated_seq"]
+    await db.versions.update_one({"id": "account_seq"}, {"$max": {"tombstones_pruned_seq": pruned_seq}})
+    result = await db.account_tombstones.delete_many({"updated_seq": {"$lte": pruned_seq}})
+    return result.deleted_count
+
+async def prune_in_flight_seqs():
+    """Forget pending seqs whose writer never cleared them (crashed or cancelled)"""
+    cutoff = datetime.now(timezone.utc) - ACCOUNT_WRITE_TIMEOUT
+    await db.versions.update_one({"id": "account_seq"}, {"$pull": {"pending": {"at": {"$lt": cutoff}}}})
+
+async def backfill_updated_seq():
+    """Stamp accounts written before updated_seq existed, so delta sync sees them"""
+    async with account_write() as write:
+        result = await db.accounts.update_many(
+            {"updated_seq": {"$exists": False}},
+            {"$set": {"updated_seq": write.seq}}
+        )
+    if result.modified_count:
+        logger.info(f"Stamped updated_seq on {result.modified_count} account(s)")
+
+def make_etag(versions: Dict[str, object], *parts: str) -> str:
+    """ETag from collection versions and whatever else shapes the response.
+
+    Weak, because the br, gzip and identity encodings of a response share
+    it (see VaryEncodingMiddleware).
+    """
+    tag = "-".join(str(versions[name]) for name in sorted(versions))
+    if any(parts):
+        tag += "-" + hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+    return f'W/"{tag}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against etag (the W/ prefix is ignored)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+# Helper functions
+def expired_confirmation_filter(now: Optional[datetime] = None) -> dict:
+    """Mongo filter matching accounts whose confirmation has reached its reset_at"""
+    return {"confirmed": True, "reset_at": {"$lte": now or datetime.now(timezone.utc)}}
+
+def reset_fields() -> dict:
+    """Fields written to an account when its confirmation expires"""
+    return {
+        "confirmed": False,
+        "confirmed_at": None,
+        "reset_at": None,
+        "bosses": BossQuantities().model_dump(),
+        "special_bosses": SpecialBosses().model_dump(),
+        "gold": 0,
+        "total_usd": 0.0
+    }
+
+async def reset_expired_accounts(now: Optional[datetime] = None, ids: Optional[List[str]] = None) -> int:
+    """Reset every expired confirmation (of ids, if given) in a single update_many; returns how many were reset"""
+    expired = expired_confirmation_filter(now)
+    if ids is not None:
+        expired["id"] = {"$in": ids}
+    ids = [doc["id"] for doc in await db.accounts.find(expired, {"_id": 0, "id": 1}).to_list(None)]
+    if not ids:
+        return 0
+    expired = {**expired, "id": {"$in": ids}}
     
-    reset_count = 0
+    # The totals move before the seq is cleared, so a dashboard ETag taken
+    # once the reset is visible already covers the new totals
+    async with account_write() as write:
+        # Sum what is about to be zeroed so fleet totals can be decremented
+        before = await sum_fleet_counts(expired)
+        changes = {**reset_fields(), "updated_seq": write.seq}
+        result = await db.accounts.update_many(expired, {"$set": changes})
+        if result.modified_count == before["accounts"]:
+            write.add_fleet_delta({path: -value for path, value in before.items() if path != "accounts"})
+        else:
+            # Something changed between the sum and the update; recount instead
+            await reconcile_fleet_totals()
+    if result.modified_count:
+        change_hub.publish({
+            "type": "reset",
+            "ids": ids,
+            "seq": changes["updated_seq"],
+            "changes": diff_documents({}, changes)
+        })
+    return result.modified_count
+
+# Confirmation expiry: one task sleeping until the earliest reset_at
+expiry_scheduler = ExpiryScheduler(lambda ids, now: reset_expired_accounts(now, ids))
+
+def schedule_expiry(account: dict):
+    """Keep the expiry scheduler in step with an account write (followers load it when elected)"""
+    if leader_lease.is_leader:
+        expiry_scheduler.schedule(account["id"], account.get("reset_at") if account.get("confirmed") else None)
+
+async def load_expiry_deadlines():
+    """(Re)build the deadline heap from the confirmed accounts (index confirmed_reset_at)"""
+    cursor = db.accounts.find(
+        {"confirmed": True, "reset_at": {"$ne": None}}, {"_id": 0, "id": 1, "reset_at": 1}
+    ).sort("reset_at", ASCENDING)
+    expiry_scheduler.load([(doc["id"], doc["reset_at"]) async for doc in cursor])
+
+async def sync_expiry_deadlines(horizon: timedelta) -> int:
+    """Schedule the deadlines due within horizon, including those set by other workers"""
+    cursor = db.accounts.find(
+        {"confirmed": True, "reset_at": {"$lte": datetime.now(timezone.utc) + horizon}},
+        {"_id": 0, "id": 1, "reset_at": 1}
+    )
+    synced = 0
+    async for doc in cursor:
+        expiry_scheduler.schedule(doc["id"], doc["reset_at"])
+        synced += 1
+    return synced
+
+async def scheduled_expiry_sync_job():
+    try:
+        await sync_expiry_deadlines(2 * EXPIRY_SYNC_INTERVAL)
+    except Exception as e:
+        logger.error(f"Error syncing confirmation deadlines: {e}")
+
+async def backfill_reset_at():
+    """Precompute reset_at for confirmations made before it was stored"""
+    result = await db.accounts.update_many(
+        {"confirmed_at": {"$type": "date"}, "reset_at": {"$exists": False}},
+        [{"$set": {"reset_at": {"$add": ["$confirmed_at", RESET_AFTER // timedelta(milliseconds=1)]}}}]
+    )
+    if result.modified_count:
+        logger.info(f"Stored reset_at on {result.modified_count} account(s)")
+
+# Fleet totals: a summary kept current with $inc deltas, under "fleet" on the
+# account_seq counter document (see account_write)
+FLEET_TOTAL_FIELDS = ["accounts", "gold"] + [f"{tier.group}.{tier.key}" for tier in BOSS_CATALOG]
+
+def fleet_counts(account: dict) -> Dict[str, float]:
+    """Contribution of one account to the fleet totals, keyed by dotted path"""
+    counts = {"accounts": 1, "gold": account.get("gold", 0)}
+    for tier in BOSS_CATALOG:
+        counts[f"{tier.group}.{tier.key}"] = (account.get(tier.group) or {}).get(tier.key, 0)
+    return counts
+
+def fleet_delta(before: Optional[dict], after: Optional[dict]) -> Dict[str, float]:
+    """Non-zero changes to the fleet totals when an account goes from before to after"""
+    old = fleet_counts(before) if before else {}
+    new = fleet_counts(after) if after else {}
+    delta = {path: new.get(path, 0) - old.get(path, 0) for path in FLEET_TOTAL_FIELDS}
+    return {path: value for path, value in delta.items() if value}
+
+async def sum_fleet_counts(query: dict) -> Dict[str, float]:
+    """Fleet totals over the accounts matching query, computed by the server"""
+    group = {"_id": None}
+    for path in FLEET_TOTAL_FIELDS:
+        # $group output names cannot contain dots
+        group[path.replace(".", "__")] = {"$sum": 1} if path == "accounts" else {"$sum": f"${path}"}
+    rows = await db.accounts.aggregate([{"$match": query}, {"$group": group}]).to_list(1)
+    row = rows[0] if rows else {}
+    return {path: row.get(path.replace(".", "__"), 0) for path in FLEET_TOTAL_FIELDS}
+
+def nest_paths(flat: Dict[str, float]) -> dict:
+    nested: dict = {}
+    for path, value in flat.items():
+        *parents, leaf = path.split(".")
+        target = nested
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = value
+    return nested
+
+def stored_fleet_counts(stored: Optional[dict]) -> Dict[str, float]:
+    """Every FLEET_TOTAL_FIELDS path of the stored totals; paths no $inc has touched yet are 0"""
+    counts = {}
+    for path in FLEET_TOTAL_FIELDS:
+        value = stored
+        for key in path.split("."):
+            value = (value or {}).get(key, 0)
+        counts[path] = value
+    return counts
+
+async def stored_fleet_totals() -> Optional[dict]:
+    doc = await db.versions.find_one({"id": "account_seq"}, {"_id": 0, "fleet": 1})
+    return (doc or {}).get("fleet")
+
+async def fleet_totals_drift() -> Tuple[Dict[str, float], Dict[str, float], bool]:
+    """(actual totals, drift from the stored ones, whether stored totals exist)"""
+    actual = await sum_fleet_counts({})
+    stored = await stored_fleet_totals() or {}
+    drift = {}
+    for path, value in stored_fleet_counts(stored).items():
+        if abs(actual[path] - value) > 1e-6:
+            drift[path] = actual[path] - value
+    return actual, drift, bool(stored)
+
+async def reconcile_fleet_totals() -> Dict[str, float]:
+    """Recount the fleet totals from the accounts and fix any drift; returns the drift found"""
+    actual, drift, exists = await fleet_totals_drift()
+    if drift or not exists:
+        # A fix changes what the dashboard shows, so it takes a seq like any
+        # account write and the dashboard ETag moves with it; recount under
+        # it so no write lands between the count and the replace unnoticed
+        async with account_write():
+            actual, drift, exists = await fleet_totals_drift()
+            await db.versions.update_one({"id": "account_seq"}, {"$set": {"fleet": nest_paths(actual)}})
+    if drift:
+        logger.warning(f"Fleet totals drift corrected: {drift}")
+    return drift
+
+async def scheduled_reconcile_job():
+    """Background job to correct drift in the fleet totals and the stored account values"""
+    try:
+        await reconcile_fleet_totals()
+    except Exception as e:
+        logger.error(f"Error reconciling fleet totals: {e}")
+    try:
+        await prune_in_flight_seqs()
+    except Exception as e:
+        logger.error(f"Error pruning in-flight seqs: {e}")
+    try:
+        pruned = await prune_tombstones()
+        if pruned:
+            logger.info(f"Pruned {pruned} tombstone(s) older than {TOMBSTONE_RETENTION.days} days")
+    except Exception as e:
+        logger.error(f"Error pruning tombstones: {e}")
+    try:
+        await observe_boss_prices_version()
+        revalued = await recompute_total_usd(await current_boss_prices())
+        if revalued:
+            logger.info(f"Revalued {revalued} account(s) with a stale total_usd")
+    except Exception as e:
+        logger.error(f"Error recomputing total_usd: {e}")
+
+# total_usd is stored on every account (and indexed) for value sorting and ranges
+async def recompute_total_usd(prices: BossPrices) -> int:
+    """Revalue every account whose stored total_usd differs; returns how many were rewritten.
+
+    Valued with value_accounts, the same arithmetic as every other path, and
+    written chunk by chunk, each write conditional on the updated_seq read.
+    Rewritten accounts are stamped with one new seq, so /accounts/changes
+    reports them and the accounts ETag moves once the writes are done.
+    """
+    cursor = db.accounts.find(
+        {}, {"_id": 0, "id": 1, "total_usd": 1, "updated_seq": 1, **dict.fromkeys(BOSS_GROUPS, 1)},
+        batch_size=ACCOUNT_CHUNK_SIZE
+    )
+    revalued = 0
+    async with account_write() as write:
+        chunk = []
+        async for account in cursor:
+            chunk.append(account)
+            if len(chunk) == ACCOUNT_CHUNK_SIZE:
+                revalued += await store_total_usd_chunk(chunk, prices, write.seq)
+                chunk = []
+        revalued += await store_total_usd_chunk(chunk, prices, write.seq)
+    return revalued
+
+async def store_total_usd_chunk(accounts: List[dict], prices: BossPrices, seq: int) -> int:
+    operations = [
+        UpdateOne(
+            {"id": account["id"], "updated_seq": account.get("updated_seq")},
+            {"$set": {"total_usd": total_usd, "updated_seq": seq}}
+        )
+        for account, total_usd in zip(accounts, value_accounts(accounts, prices))
+        if account.get("total_usd") != total_usd
+    ]
+    if not operations:
+        return 0
+    result = await db.accounts.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+async def store_craft_summaries(accounts: List[dict]):
+    """Persist the craft_summary of freshly written accounts whose craft inputs changed.
+
+    One write per account whose summary moved, conditional on the updated_seq
+    the account write stamped, so a newer write's summary is never
+    overwritten by an older one. Call it inside the write's account_write() block.
+    """
+    operations = []
+    for account, summary in zip(accounts, summarize_craft(accounts)):
+        if account.get("craft_summary") != summary:
+            account["craft_summary"] = summary
+            operations.append(UpdateOne(
+                {"id": account["id"], "updated_seq": account.get("updated_seq")},
+                {"$set": {"craft_summary": summary}}
+            ))
+    if operations:
+        await db.accounts.bulk_write(operations, ordered=False)
+
+def account_response(account: dict, total_usd: float) -> dict:
+    """Turn a stored account into its API representation (in place): ISO dates plus its USD value"""
+    account["total_usd"] = total_usd
+    for field in ACCOUNT_DATE_FIELDS:
+        value = account.get(field)
+        if isinstance(value, datetime):
+            account[field] = value.isoformat()
+    return account
+
+def account_fieldset(fields: Optional[str], view: Optional[str]) -> Optional[tuple]:
+    """Top-level fields requested through ?fields= or ?view= (None means the whole document)"""
+    if view is not None:
+        if fields is not None:
+            raise HTTPException(status_code=400, detail="Use either fields or view")
+        return ACCOUNT_VIEWS[view]
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in ACCOUNT_READ_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *requested]))
+
+def account_projection(fieldset: Optional[tuple], *required: str) -> dict:
+    """Mongo projection for a fieldset, plus what valuation (and the caller) needs"""
+    if fieldset is None:
+        return {"_id": 0}
+    return {"_id": 0, **dict.fromkeys([*fieldset, *BOSS_GROUPS, *required], 1)}
+
+def sparse_account(account: dict, fieldset: Optional[tuple]) -> dict:
+    """Drop fields that were only read to compute total_usd"""
+    if fieldset is not None:
+        for field in [field for field in account if field not in fieldset and field != "total_usd"]:
+            del account[field]
+    return account
+
+async def find_account_document(account_id: str, projection: Optional[dict] = None) -> dict:
+    """Read one account, raising 404 if it does not exist"""
+    account = await db.accounts.find_one({"id": account_id}, projection or {"_id": 0})
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return account
+
+def flatten_fields(data: dict, prefix: str = "") -> dict:
+    """Nested update data as dotted leaf paths, so $set only touches the fields sent"""
+    fields = {}
+    for key, value in data.items():
+        if isinstance(value, dict) and value:
+            fields.update(flatten_fields(value, f"{prefix}{key}."))
+        else:
+            fields[f"{prefix}{key}"] = value
+    return fields
+
+def touches_craft_inputs(paths) -> bool:
+    return any(path.split(".")[0] in CRAFT_INPUT_FIELDS for path in paths)
+
+def update_pipeline(operations: dict, prices: BossPrices) -> list:
+    """$set/$inc operators as an update pipeline that also stores the new total_usd.
+
+    Set values are $literal (a string starting with "$" is a value, not a
+    field path) and increments add to the current value, so the first stage
+    changes what the operators would; the second values the result.
+    """
+    changes = {path: {"$literal": value} for path, value in operations.get("$set", {}).items()}
+    for path, amount in operations.get("$inc", {}).items():
+        changes[path] = {"$add": [{"$ifNull": [f"${path}", 0]}, amount]}
+    return [{"$set": changes}, {"$set": {"total_usd": usd_expression(prices)}}]
+
+def apply_update(document: dict, operations: dict) -> dict:
+    """Apply $set/$inc operators (dotted paths allowed) to a copy of a document, as MongoDB would"""
+    result = copy.deepcopy(document)
+    for operator, fields in operations.items():
+        for path, value in fields.items():
+            *parents, leaf = path.split(".")
+            target = result
+            for key in parents:
+                target = target.setdefault(key, {})
+            if operator == "$set":
+                target[leaf] = value
+            elif operator == "$inc":
+                target[leaf] = target.get(leaf, 0) + value
+            else:
+                raise ValueError(f"Unsupported update operator {operator}")
+    return result
+
+async def update_account_document(account_id: str, operations: dict) -> dict:
+    """Apply update operators to one account and return the updated document.
+
+    A single find_one_and_update round trip, which also stores the new
+    total_usd (see update_pipeline); a missing account raises 404. The
+    pre-image is returned and the update replayed locally, so the fleet
+    totals delta comes for free. Decrements of non-negative fields are
+    guarded in the filter and raise 409 instead of going below zero.
+    """
+    guards = {
+        path: {"$gte": -amount} for path, amount in operations.get("$inc", {}).items()
+        if amount < 0 and ACCOUNT_EDIT_PATHS.get(path) and ACCOUNT_EDIT_PATHS[path].metadata
+    }
+    async with account_write() as write:
+        prices = await current_boss_prices()
+        operations = {**operations, "$set": {**operations.get("$set", {}), "updated_seq": write.seq}}
+        before = await db.accounts.find_one_and_update(
+            {"id": account_id, **guards},
+            update_pipeline(operations, prices),
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not before:
+            if guards and await db.accounts.find_one({"id": account_id}, {"_id": 1}):
+                raise HTTPException(status_code=409, detail="Decrement would make a field negative")
+            raise HTTPException(status_code=404, detail="Account not found")
+        account = apply_update(before, operations)
+        account["total_usd"] = calculate_account_usd(account, prices)
+        if touches_craft_inputs(path for fields in operations.values() for path in fields):
+            await store_craft_summaries([account])
+        write.add_fleet_delta(fleet_delta(before, account))
+    schedule_expiry(account)
+    await publish_account_update(before, account)
+    return account
+
+async def refresh_craft_summaries(accounts: List[dict]):
+    """Compute and store craft_summary for accounts read without one (written before it existed).
+
+    Each write is conditional on the updated_seq the account was read with,
+    so a summary of an older state never overwrites a newer write; the new
+    seq is published once the writes are done.
+    """
+    if not accounts:
+        return
+    async with account_write() as write:
+        operations = []
+        for account, summary in zip(accounts, summarize_craft(accounts)):
+            operations.append(UpdateOne(
+                {"id": account["id"], "updated_seq": account.get("updated_seq")},
+                {"$set": {"craft_summary": summary, "updated_seq": write.seq}}
+            ))
+            account["craft_summary"] = summary
+            account["updated_seq"] = write.seq
+        await db.accounts.bulk_write(operations, ordered=False)
     for account in accounts:
-        confirmed_at_str = account.get('confirmed_at')
-        if confirmed_at_str:
-            confirmed_at = datetime.fromisoformat(confirmed_at_str.replace('Z', '+00:00'))
-            if confirmed_at < thirty_days_ago:
-                await db.accounts.update_one(
-                    {"id": account['id']},
-                    {"$set": {
-                        "confirmed": False,
-                        "confirmed_at": None,
-                        "bosses": {
-                            "medio2": 0, "grande2": 0,
-                            "medio4": 0, "grande4": 0,
-                            "medio6": 0, "grande6": 0,
-                            "medio7": 0, "grande7": 0,
-                            "medio8": 0, "grande8": 0
-                        },
-                        "special_bosses": {
-                            "xama": 0, "praca_4f": 0, "cracha_epica": 0
-                        },
-                        "gold": 0
-                    }}
-                )
-                reset_count += 1
-    
-    return reset_count
+        change_hub.publish({
+            "type": "updated", "id": account["id"], "seq": write.seq, "changes": {"craft_summary": account["craft_summary"]}
+        })
+
+async def backfill_craft_summaries():
+    """Store craft_summary on accounts written before it was persisted, a chunk at a time"""
+    cursor = db.accounts.find({"craft_summary": {"$exists": False}}, CRAFT_PROJECTION, batch_size=ACCOUNT_CHUNK_SIZE)
+    backfilled = 0
+    chunk = []
+    async for account in cursor:
+        chunk.append(account)
+        if len(chunk) == ACCOUNT_CHUNK_SIZE:
+            await refresh_craft_summaries(chunk)
+            backfilled += len(chunk)
+            chunk = []
+    await refresh_craft_summaries(chunk)
+    backfilled += len(chunk)
+    if backfilled:
+        logger.info(f"Stored craft_summary on {backfilled} account(s)")
+
+async def iter_valued_accounts(query: dict, prices: BossPrices, sort=None, limit: int = 0, fieldset: Optional[tuple] = None):
+    """Yield chunks of API-ready accounts straight off the cursor, valued chunk by chunk"""
+    cursor = db.accounts.find(query, account_projection(fieldset), batch_size=ACCOUNT_CHUNK_SIZE)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    def respond(chunk):
+        return [
+            sparse_account(account_response(account, total), fieldset)
+            for account, total in zip(chunk, value_accounts(chunk, prices))
+        ]
+
+    chunk = []
+    async for account in cursor:
+        chunk.append(account)
+        if len(chunk) == ACCOUNT_CHUNK_SIZE:
+            yield respond(chunk)
+            chunk = []
+    if chunk:
+        yield respond(chunk)
+
+async def iter_raw_accounts(query: dict, prices: BossPrices, sort=None, limit: int = 0, fieldset: Optional[tuple] = None):
+    """Yield (JSON objects, last id) per chunk, straight from raw BSON (see rawjson.py)"""
+    pipeline = raw_account_pipeline(query, fieldset or ACCOUNT_READ_FIELDS, ACCOUNT_DATE_FIELDS, sort, limit)
+    cursor = db.accounts.with_options(codec_options=RAW_CODEC_OPTIONS).aggregate(pipeline, batchSize=ACCOUNT_CHUNK_SIZE)
+
+    chunk = []
+    async for document in cursor:
+        chunk.append(document)
+        if len(chunk) == ACCOUNT_CHUNK_SIZE:
+            yield raw_account_json(chunk, prices), chunk[-1]["account"]["id"]
+            chunk = []
+    if chunk:
+        yield raw_account_json(chunk, prices), chunk[-1]["account"]["id"]
+
+def usd_range_filter(min_usd: Optional[float], max_usd: Optional[float]) -> dict:
+    bounds = {}
+    if min_usd is not None:
+        bounds["$gte"] = min_usd
+    if max_usd is not None:
+        bounds["$lte"] = max_usd
+    return {"total_usd": bounds} if bounds else {}
+
+def value_keyset_filter(after: str, descending: bool) -> dict:
+    """Accounts after a "<total_usd>|<id>" cursor, in (total_usd, id) order (both reversed when descending)"""
+    usd, separator, account_id = after.partition("|")
+    try:
+        usd = float(usd)
+    except ValueError:
+        separator = ""
+    if not separator:
+        raise HTTPException(status_code=400, detail="Invalid after cursor")
+    after_op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {"total_usd": {after_op: usd}},
+        {"total_usd": usd, "id": {after_op: account_id}}
+    ]}
+
+async def iter_stored_value_accounts(query: dict, sort, limit: int = 0, fieldset: Optional[tuple] = None):
+    """Yield chunks of API-ready accounts valued by their stored total_usd (index-backed)"""
+    projection = {"_id": 0, **dict.fromkeys([*fieldset, "total_usd"], 1)} if fieldset else {"_id": 0}
+    cursor = db.accounts.find(query, projection, batch_size=ACCOUNT_CHUNK_SIZE).sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    
+    chunk = []
+    async for account in cursor:
+        chunk.append(sparse_account(account_response(account, account.get("total_usd")), fieldset))
+        if len(chunk) == ACCOUNT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def parse_iso_datetime(value: str) -> datetime:
+    """Parse a legacy ISO timestamp as stored before dates were native BSON"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+async def migrate_account_dates(batch_size: int = 500) -> int:
+    """Convert legacy ISO string dates on accounts to BSON dates, in batches.
+
+    Progress is checkpointed in the migrations collection after each batch,
+    so an interrupted run resumes after the last converted document.
+    """
+    state = await db.migrations.find_one({"id": DATE_MIGRATION_ID}) or {}
+    if state.get("completed_at"):
+        return 0
+
+    last_id = state.get("last_id")
+    converted = state.get("converted", 0)
+    string_dates = {"$or": [{field: {"$type": "string"}} for field in ACCOUNT_DATE_FIELDS]}
+    logger.info(f"Migrating account dates to BSON (resuming after {last_id})" if last_id else "Migrating account dates to BSON")
+
+    while True:
+        query = {**string_dates, "_id": {"$gt": last_id}} if last_id else string_dates
+        batch = await db.accounts.find(
+            query, {field: 1 for field in ACCOUNT_DATE_FIELDS}
+        ).sort("_id", ASCENDING).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            changes = {}
+            for field in ACCOUNT_DATE_FIELDS:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    changes[field] = parse_iso_datetime(value)
+                except ValueError:
+                    logger.error(f"Unparseable {field} {value!r} on account {doc['_id']}, leaving as is")
+            if changes:
+                # Guard on the original values so a concurrent write is never clobbered
+                original = {field: doc[field] for field in changes}
+                operations.append(UpdateOne({"_id": doc["_id"], **original}, {"$set": changes}))
+
+        if operations:
+            # Allocating a seq moves the accounts ETag on
+            async with account_write():
+                result = await db.accounts.bulk_write(operations, ordered=False)
+            converted += result.modified_count
+
+        last_id = batch[-1]["_id"]
+        await db.migrations.update_one(
+            {"id": DATE_MIGRATION_ID},
+            {"$set": {"last_id": last_id, "converted": converted}},
+            upsert=True
+        )
+
+    await db.migrations.update_one(
+        {"id": DATE_MIGRATION_ID},
+        {"$set": {"converted": converted, "completed_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    logger.info(f"Account date migration complete. Converted {converted} account(s).")
+    return converted
+
+async def check_and_reset_accounts():
+    """Reset every confirmation past its reset_at - called manually"""
+    return await reset_expired_accounts()
 
 # Routes
 @api_router.get("/")
 async def root():
     return {"message": "MIR4 Account Manager API"}
 
-@api_router.get("/scheduler-status")
-async def get_scheduler_status():
-    """Get the status of the scheduler and next run time"""
+def scheduler_status() -> dict:
     jobs = scheduler.get_jobs()
     job_info = []
     for job in jobs:
@@ -283,125 +1224,647 @@ async def get_scheduler_status():
             "id": job.id,
             "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None
         })
-    return {"scheduler_running": scheduler.running, "jobs": job_info}
+    return {
+        "scheduler_running": scheduler.running,
+        "jobs": job_info,
+        "expiry": expiry_scheduler.stats(),
+        "leader": leader_lease.stats()
+    }
+
+@api_router.get("/scheduler-status")
+async def get_scheduler_status():
+    """Get the status of the scheduler and next run time"""
+    return scheduler_status()
+
+@api_router.get("/cache-status")
+async def get_cache_status():
+    """Hit/miss counters of the in-process boss price cache"""
+    return {"boss_prices": boss_prices_cache.stats()}
+
+@api_router.get("/index-status")
+async def get_index_status():
+    """Report of the indexes ensured at startup"""
+    return index_report
+
+@api_router.get("/events")
+async def stream_events(request: Request):
+    """Server-Sent Events stream of account changes (created/updated/deleted/reset/prices).
+
+    Events are fanned out in process: a client only sees the writes handled
+    by the worker it is connected to, so complete streams need one worker.
+    """
+    subscriber = change_hub.subscribe()
+    
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, event.get("seq"))
+                if event["type"] == "evicted":
+                    break
+        finally:
+            change_hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.get("/events/status")
+async def get_events_status():
+    """Subscribers and evictions of the in-process event hub"""
+    return change_hub.stats()
 
 @api_router.get("/boss-prices", response_model=BossPrices)
-async def get_boss_prices():
-    prices = await db.boss_prices.find_one({"id": "default"}, {"_id": 0})
-    if not prices:
-        default_prices = BossPrices()
-        await db.boss_prices.insert_one(default_prices.model_dump())
-        return default_prices
-    return BossPrices(**prices)
+async def get_boss_prices(request: Request, response: Response):
+    # Versions are read before the data, so an ETag never claims newer data than it describes
+    versions = await read_versions("boss_prices")
+    boss_prices_cache.observe_version(versions["boss_prices"])
+    etag = make_etag(versions)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return await current_boss_prices()
 
 @api_router.put("/boss-prices", response_model=BossPrices)
 async def update_boss_prices(update: BossPricesUpdate):
-    current_prices = await db.boss_prices.find_one({"id": "default"}, {"_id": 0})
+    update_data = update.model_dump(exclude_unset=True)
+    prices = await save_price_profile(DEFAULT_PRICE_PROFILE, update_data)
+    boss_prices_cache.set(prices)
+    if update_data:
+        await recompute_total_usd(prices)
+    # Only now, or value-sorted reads during the recompute would cache stale totals under the new ETag
+    boss_prices_cache.observe_version(await bump_version("boss_prices"))
+    if update_data:
+        # Every total_usd changes with the prices; dashboards refetch the values
+        change_hub.publish({"type": "prices", "changes": update_data})
+    return prices
+
+@api_router.get("/boss-prices/profiles", response_model=List[BossPrices])
+async def list_price_profiles(request: Request, response: Response):
+    """Every price profile, default first"""
+    # The default profile is versioned as boss_prices, the named ones as price_profiles
+    versions = await read_versions("boss_prices", "price_profiles")
+    boss_prices_cache.observe_version(versions["boss_prices"])
+    etag = make_etag(versions, "profiles")
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return await load_price_profiles()
+
+@api_router.get("/boss-prices/{profile}", response_model=BossPrices)
+async def get_price_profile(profile: str, request: Request, response: Response):
+    check_price_profile_name(profile)
+    versions = await read_versions("boss_prices", "price_profiles")
+    boss_prices_cache.observe_version(versions["boss_prices"])
+    etag = make_etag(versions, profile)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    prices = (await load_price_profiles([profile]))[0]
+    response.headers["ETag"] = etag
+    return prices
+
+@api_router.put("/boss-prices/{profile}", response_model=BossPrices)
+async def update_price_profile(profile: str, update: BossPricesUpdate):
+    """Create or update a named price profile (PUT /boss-prices/default edits the default)"""
+    check_price_profile_name(profile)
+    if profile == DEFAULT_PRICE_PROFILE:
+        return await update_boss_prices(update)
+    prices = await save_price_profile(profile, update.model_dump(exclude_unset=True))
+    await bump_version("price_profiles")
+    return prices
+
+@api_router.delete("/boss-prices/{profile}")
+async def delete_price_profile(profile: str):
+    check_price_profile_name(profile)
+    if profile == DEFAULT_PRICE_PROFILE:
+        raise HTTPException(status_code=400, detail="The default price profile cannot be deleted")
+    result = await db.boss_prices.delete_one({"id": profile})
+    if not result.deleted_count:
+        raise HTTPException(status_code=404, detail="Price profile not found")
+    await bump_version("price_profiles")
+    return {"message": "Price profile deleted successfully"}
+
+async def raw_accounts_response(query, prices, sort, page_size, fieldset, format, etag, paginated) -> Response:
+    """The raw=true variant of GET /accounts"""
+    chunks = iter_raw_accounts(query, prices, sort, page_size, fieldset)
+    if format == "ndjson":
+        async def stream():
+            async for accounts, _ in chunks:
+                yield b"\n".join(accounts) + b"\n"
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"ETag": etag})
     
-    if not current_prices:
-        current_prices = BossPrices().model_dump()
+    accounts, last_id = [], None
+    async for chunk, last_id in chunks:
+        accounts.extend(chunk)
     
-    update_data = update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        current_prices[key] = value
+    headers = {"ETag": etag}
+    if paginated:
+        headers["X-Next-After"] = last_id if len(accounts) == page_size else ""
+    return Response(b"[" + b",".join(accounts) + b"]", media_type="application/json", headers=headers)
+
+@api_router.get("/accounts")
+async def get_accounts(
+    request: Request,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=ACCOUNT_PAGE_MAX),
+    format: Optional[str] = Query(default=None, pattern="^ndjson$"),
+    fields: Optional[str] = None,
+    view: Optional[str] = Query(default=None, pattern="^dashboard$"),
+    raw: bool = False,
+    sort: Optional[str] = Query(default=None, pattern="^-?total_usd$"),
+    min_usd: Optional[float] = None,
+    max_usd: Optional[float] = None
+):
+    """List accounts with their USD value.
+
+    Without parameters every account is returned. `limit`/`after` page through
+    accounts ordered by id (keyset pagination; the next cursor is returned in
+    the X-Next-After header). `format=ndjson` streams one account per line.
+    `fields=name,gold` or `view=dashboard` return only those fields (plus id
+    and total_usd). `raw=true` encodes straight from raw BSON, without
+    decoding accounts into dicts. `sort=-total_usd` and `min_usd`/`max_usd`
+    are served by the stored, indexed total_usd; with a value sort the
+    cursor is "<total_usd>|<id>". Responds 304 to a matching If-None-Match
+    without reading any account.
+    """
+    fieldset = account_fieldset(fields, view)
+    versions = await read_versions("accounts", "boss_prices")
+    boss_prices_cache.observe_version(versions["boss_prices"])
+    etag = make_etag(versions, str(request.url.query))
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     
-    await db.boss_prices.update_one(
-        {"id": "default"},
-        {"$set": current_prices},
-        upsert=True
+    prices = await current_boss_prices()
+    paginated = after is not None or limit is not None
+    page_size = limit or (ACCOUNT_PAGE_MAX if paginated else 0)
+    by_value = sort is not None
+    query = {"id": {"$gt": after}} if after is not None and not by_value else {}
+    order = [("id", ASCENDING)] if paginated else None
+    
+    if by_value or min_usd is not None or max_usd is not None:
+        if raw:
+            raise HTTPException(status_code=400, detail="raw does not support sort, min_usd or max_usd")
+        value_query = {**query, **usd_range_filter(min_usd, max_usd)}
+        if by_value:
+            direction = DESCENDING if sort.startswith("-") else ASCENDING
+            order = [("total_usd", direction), ("id", direction)]
+            if after is not None:
+                value_query = {"$and": [value_query, value_keyset_filter(after, direction == DESCENDING)]}
+        chunks = lambda: iter_stored_value_accounts(value_query, order or [("id", ASCENDING)], page_size, fieldset)
+    elif raw:
+        return await raw_accounts_response(query, prices, order, page_size, fieldset, format, etag, paginated)
+    else:
+        chunks = lambda: iter_valued_accounts(query, prices, order, page_size, fieldset)
+    
+    if format == "ndjson":
+        async def stream():
+            async for chunk in chunks():
+                yield b"".join(orjson.dumps(account) + b"\n" for account in chunk)
+        return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"ETag": etag})
+    
+    accounts = []
+    async for chunk in chunks():
+        accounts.extend(chunk)
+    
+    headers = {"ETag": etag}
+    if paginated:
+        next_after = None
+        if len(accounts) == page_size:
+            last = accounts[-1]
+            next_after = f"{last['total_usd']!r}|{last['id']}" if by_value else last["id"]
+        headers["X-Next-After"] = next_after or ""
+    # Accounts are already JSON-ready (ISO dates), so skip jsonable_encoder
+    return ORJSONResponse(accounts, headers=headers)
+
+DASHBOARD_SNAPSHOT_ATTEMPTS = 3
+
+@api_router.get("/dashboard")
+async def get_dashboard(request: Request):
+    """Everything the dashboard page loads, in one response.
+
+    Accounts (dashboard view, valued), the price table they were valued
+    with, fleet totals and scheduler status. The collection versions are
+    read before and after: if a write lands in between the snapshot is
+    rebuilt, so accounts, prices and totals always agree. Writes landing
+    through every attempt respond 503 with Retry-After.
+    
+    The ETag covers the data versions only: the scheduler block (next runs,
+    lease expiry, which worker answered) is not part of it, so two
+    responses under one ETag are equivalent, not identical.
+    """
+    for _ in range(DASHBOARD_SNAPSHOT_ATTEMPTS):
+        versions = await read_versions("accounts", "boss_prices")
+        boss_prices_cache.observe_version(versions["boss_prices"])
+        etag = make_etag(versions, "dashboard")
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        prices = await current_boss_prices()
+        accounts = []
+        async for chunk in iter_valued_accounts({}, prices, fieldset=ACCOUNT_VIEWS["dashboard"]):
+            accounts.extend(chunk)
+        totals = await fleet_totals_response(prices)
+        if await read_versions("accounts", "boss_prices") == versions:
+            break
+    else:
+        raise HTTPException(
+            status_code=503,
+            detail="Accounts kept changing while the dashboard was read",
+            headers={"Retry-After": "1"}
+        )
+    
+    return ORJSONResponse({
+        "accounts": accounts,
+        "boss_prices": prices.model_dump(),
+        "totals": totals,
+        "scheduler": scheduler_status()
+    }, headers={"ETag": etag})
+
+@api_router.get("/accounts/changes")
+async def get_account_changes(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=ACCOUNT_PAGE_MAX, ge=1, le=ACCOUNT_PAGE_MAX),
+    fields: Optional[str] = None,
+    view: Optional[str] = Query(default=None, pattern="^dashboard$")
+):
+    """Accounts changed and deleted after sequence `since`.
+
+    Pass the returned `until` as the next `since`. When `has_more` is true,
+    call again right away. Every account write stamps an updated_seq,
+    deletions leave a tombstone, and both are index-backed. Nothing past
+    the oldest write still in flight is returned. `fields`/`view`
+    work as on GET /accounts. Tombstones are kept TOMBSTONE_RETENTION_DAYS;
+    a `since` older than the pruned ones responds 410, and the client
+    resyncs from since=0.
+    """
+    fieldset = account_fieldset(fields, view)
+    projection = account_projection(fieldset, "updated_seq")
+    # Writes still in flight hold the feed back, or a client would move past them for good
+    pruned_seq, committed = await account_feed_bounds()
+    if 0 < since < pruned_seq:
+        raise HTTPException(status_code=410, detail="Deletions since this seq were pruned; resync from since=0")
+    upserts = await db.accounts.find(
+        {"updated_seq": {"$gt": since, "$lte": committed}}, projection
+    ).sort("updated_seq", ASCENDING).limit(limit + 1).to_list(limit + 1)
+    
+    has_more = len(upserts) > limit
+    if has_more:
+        # Never split a sequence number across pages (bulk writes share one)
+        boundary = upserts[limit]["updated_seq"]
+        upserts = [account for account in upserts if account["updated_seq"] < boundary]
+        if not upserts:
+            upserts = await db.accounts.find({"updated_seq": boundary}, projection).to_list(None)
+        until = upserts[-1]["updated_seq"]
+        seq_range = {"$gt": since, "$lte": until}
+    else:
+        seq_range = {"$gt": since, "$lte": committed}
+    
+    deletions = await db.account_tombstones.find(
+        {"updated_seq": seq_range}, {"_id": 0, "id": 1, "updated_seq": 1}
+    ).sort("updated_seq", ASCENDING).to_list(None)
+    
+    until = max(
+        [since]
+        + [account["updated_seq"] for account in upserts]
+        + [tombstone["updated_seq"] for tombstone in deletions]
     )
+    prices = await current_boss_prices()
+    return ORJSONResponse({
+        "upserts": [
+            sparse_account(account_response(account, total_usd), fieldset)
+            for account, total_usd in zip(upserts, value_accounts(upserts, prices))
+        ],
+        "deletions": [tombstone["id"] for tombstone in deletions],
+        "until": until,
+        "has_more": has_more
+    })
+
+async def fleet_totals_response(prices: BossPrices) -> dict:
+    totals = await stored_fleet_totals()
+    if totals is None:
+        await reconcile_fleet_totals()
+        totals = await stored_fleet_totals()
     
-    return BossPrices(**current_prices)
+    totals = nest_paths(stored_fleet_counts(totals))
+    
+    usd = {}
+    for tier in BOSS_CATALOG:
+        count = totals[tier.group][tier.key]
+        usd[tier.key] = round(count * getattr(prices, tier.price_field), 2)
+    return {**totals, "usd": usd, "total_usd": round(sum(usd.values()), 2)}
 
-@api_router.get("/accounts")
-async def get_accounts():
-    accounts = await db.accounts.find({}, {"_id": 0}).to_list(1000)
-    prices = await get_boss_prices()
+@api_router.get("/accounts/valuations")
+async def get_account_valuations(request: Request, profiles: Optional[str] = None):
+    """Every account's USD value under each price profile (all of them, or ?profiles=default,eu).
+
+    Valued for every profile at once by value_accounts_by_profile, tier by
+    tier over an accounts x tiers count matrix. Responds 304 to a matching
+    If-None-Match while no account or price profile has changed.
+    """
+    versions = await read_versions("accounts", "boss_prices", "price_profiles")
+    boss_prices_cache.observe_version(versions["boss_prices"])
+    etag = make_etag(versions, "valuations", profiles or "")
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     
-    accounts_with_values = []
-    for account in accounts:
-        total_usd = calculate_account_usd(account, prices)
-        account_with_value = {**account, "total_usd": total_usd}
-        accounts_with_values.append(account_with_value)
+    names = [name.strip() for name in profiles.split(",") if name.strip()] if profiles else None
+    price_profiles = await load_price_profiles(names)
+    names = [prices.id for prices in price_profiles]
+    accounts = await db.accounts.find(
+        {}, {"_id": 0, "id": 1, "name": 1, **dict.fromkeys(BOSS_GROUPS, 1)}
+    ).to_list(None)
+    values = value_accounts_by_profile(accounts, price_profiles)
     
-    return accounts_with_values
+    return ORJSONResponse({
+        "profiles": names,
+        "accounts": [
+            {"id": account["id"], "name": account["name"], "values": dict(zip(names, row))}
+            for account, row in zip(accounts, values)
+        ],
+        "totals": {name: round(sum(column), 2) for name, column in zip(names, zip(*values))} if values
+        else dict.fromkeys(names, 0)
+    }, headers={"ETag": etag})
+
+@api_router.get("/accounts/usd-summary")
+async def get_usd_summary(min_usd: Optional[float] = None, max_usd: Optional[float] = None):
+    """Count, sum, min, max and average total_usd of the accounts in a value range, summed by MongoDB"""
+    summary = await db.accounts.aggregate([
+        {"$match": usd_range_filter(min_usd, max_usd)},
+        {"$group": {
+            "_id": None,
+            "accounts": {"$sum": 1},
+            "total_usd": {"$sum": "$total_usd"},
+            "min_usd": {"$min": "$total_usd"},
+            "max_usd": {"$max": "$total_usd"},
+            "avg_usd": {"$avg": "$total_usd"}
+        }}
+    ]).to_list(1)
+    if not summary or not summary[0]["accounts"]:
+        return {"accounts": 0, "total_usd": 0, "min_usd": None, "max_usd": None, "avg_usd": None}
+    summary = summary[0]
+    summary.pop("_id")
+    for field in ("total_usd", "min_usd", "max_usd", "avg_usd"):
+        summary[field] = round(summary[field], 2)
+    return summary
+
+@api_router.get("/accounts/totals")
+async def get_fleet_totals():
+    """Fleet-wide boss, special boss and gold totals (plus their USD value), in O(1)"""
+    return await fleet_totals_response(await current_boss_prices())
 
 @api_router.get("/accounts/{account_id}")
-async def get_account(account_id: str):
-    account = await db.accounts.find_one({"id": account_id}, {"_id": 0})
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
+async def get_account(
+    account_id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
+    view: Optional[str] = Query(default=None, pattern="^dashboard$")
+):
+    fieldset = account_fieldset(fields, view)
+    versions = await read_versions("accounts", "boss_prices")
+    boss_prices_cache.observe_version(versions["boss_prices"])
+    etag = make_etag(versions, account_id, str(request.url.query))
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    account = await find_account_document(account_id, account_projection(fieldset))
+    response.headers["ETag"] = etag
     
-    prices = await get_boss_prices()
-    total_usd = calculate_account_usd(account, prices)
+    prices = await current_boss_prices()
     
-    return {**account, "total_usd": total_usd}
+    return sparse_account(account_response(account, calculate_account_usd(account, prices)), fieldset)
 
 @api_router.post("/accounts")
 async def create_account(account_data: AccountCreate):
-    account = Account(**account_data.model_dump())
-    
-    await db.accounts.insert_one(account.model_dump())
+    account = Account(**account_data.model_dump()).model_dump()
+    account["craft_summary"] = summarize_craft([account])[0]
     
-    prices = await get_boss_prices()
-    total_usd = calculate_account_usd(account.model_dump(), prices)
+    async with account_write() as write:
+        account["total_usd"] = calculate_account_usd(account, await current_boss_prices())
+        account["updated_seq"] = write.seq
+        await db.accounts.insert_one(account)
+        account.pop("_id")
+        write.add_fleet_delta(fleet_delta(None, account))
     
-    return {**account.model_dump(), "total_usd": total_usd}
+    response = account_response(account, account["total_usd"])
+    change_hub.publish({"type": "created", "id": response["id"], "seq": response["updated_seq"], "account": response})
+    return response
 
 @api_router.put("/accounts/{account_id}")
 async def update_account(account_id: str, update: AccountUpdate):
-    existing = await db.accounts.find_one({"id": account_id}, {"_id": 0})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Account not found")
+    update_data = flatten_fields(update.model_dump(exclude_unset=True))
     
-    update_data = update.model_dump(exclude_unset=True)
+    if update_data:
+        updated_account = await update_account_document(account_id, {"$set": update_data})
+    else:
+        updated_account = await find_account_document(account_id)
+    prices = await current_boss_prices()
     
-    await db.accounts.update_one(
-        {"id": account_id},
-        {"$set": update_data}
-    )
+    return account_response(updated_account, calculate_account_usd(updated_account, prices))
+
+@api_router.patch("/accounts/bulk")
+async def bulk_update_accounts(edits: List[AccountBulkEdit] = Body(..., max_length=ACCOUNT_PAGE_MAX)):
+    """Apply many {id, changes} edits with one unordered bulk_write"""
+    # Merge repeated ids in request order so later edits win deterministically
+    merged: Dict[str, dict] = {}
+    for edit in edits:
+        merged.setdefault(edit.id, {}).update(flatten_fields(edit.changes.model_dump(exclude_unset=True)))
     
-    updated_account = await db.accounts.find_one({"id": account_id}, {"_id": 0})
-    prices = await get_boss_prices()
-    total_usd = calculate_account_usd(updated_account, prices)
+    ids = list(merged)
+    if not any(merged.values()):
+        found = await db.accounts.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))
+        prices = await current_boss_prices()
+    else:
+        async with account_write() as write:
+            prices = await current_boss_prices()
+            operations = [
+                UpdateOne({"id": account_id}, update_pipeline({"$set": {**changes, "updated_seq": write.seq}}, prices))
+                for account_id, changes in merged.items() if changes
+            ]
+            before = await db.accounts.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))
+            await db.accounts.bulk_write(operations, ordered=False)
+            found = await db.accounts.find({"id": {"$in": ids}}, {"_id": 0}).to_list(len(ids))
+            if touches_craft_inputs(path for changes in merged.values() for path in changes):
+                await store_craft_summaries(found)
+            # Concurrent writes between the two reads are caught by reconciliation
+            delta = dict.fromkeys(FLEET_TOTAL_FIELDS, 0)
+            for sign, accounts_state in ((-1, before), (1, found)):
+                for account in accounts_state:
+                    for path, value in fleet_counts(account).items():
+                        delta[path] += sign * value
+            write.add_fleet_delta(delta)
+        before_by_id = {account["id"]: account for account in before}
+        for account in found:
+            schedule_expiry(account)
+            if account["id"] in before_by_id:
+                await publish_account_update(before_by_id[account["id"]], account)
+    by_id = {account["id"]: account for account in found}
+    accounts = [by_id[account_id] for account_id in ids if account_id in by_id]
     
-    return {**updated_account, "total_usd": total_usd}
+    return {
+        "accounts": [
+            account_response(account, total_usd)
+            for account, total_usd in zip(accounts, value_accounts(accounts, prices))
+        ],
+        "not_found": [account_id for account_id in ids if account_id not in by_id]
+    }
+
+@api_router.patch("/accounts/{account_id}")
+async def patch_account(account_id: str, patch: AccountPatch):
+    """Set dotted paths and increment counters atomically, e.g.
+    {"set": {"bosses.medio6": 3}, "inc": {"bosses.grande4": 1}}
+    """
+    operations = patch.operations()
+    
+    if operations:
+        updated_account = await update_account_document(account_id, operations)
+    else:
+        updated_account = await find_account_document(account_id)
+    prices = await current_boss_prices()
+    
+    return account_response(updated_account, calculate_account_usd(updated_account, prices))
 
 @api_router.post("/accounts/{account_id}/confirm")
 async def confirm_account(account_id: str):
-    existing = await db.accounts.find_one({"id": account_id}, {"_id": 0})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Account not found")
+    now = datetime.now(timezone.utc)
+    # BSON dates hold milliseconds; keep the scheduled reset_at equal to the stored one
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
     
-    now = datetime.now(timezone.utc).isoformat()
+    updated_account = await update_account_document(account_id, {"$set": {
+        "confirmed": True,
+        "confirmed_at": now,
+        "reset_at": now + RESET_AFTER
+    }})
+    prices = await current_boss_prices()
     
-    await db.accounts.update_one(
-        {"id": account_id},
-        {"$set": {
-            "confirmed": True,
-            "confirmed_at": now
-        }}
-    )
+    return account_response(updated_account, calculate_account_usd(updated_account, prices))
+
+@api_router.get("/accounts/{account_id}/craft")
+async def get_account_craft(account_id: str):
+    """Legendary objective progress of one account, including craftable materials"""
+    account = await find_account_document(account_id, CRAFT_PROJECTION)
+    return {"id": account["id"], "name": account["name"], **evaluate_craft([account])[0]}
+
+@api_router.get("/accounts/{account_id}/craft/plan")
+async def get_account_craft_plan(account_id: str):
+    """Craft sequence completing the most objectives with the account's shared resources"""
+    account = await find_account_document(account_id, CRAFT_PROJECTION)
+    return {"id": account["id"], "name": account["name"], **optimize_craft(account)}
+
+@api_router.get("/craft/plans")
+async def get_craft_plans():
+    """Optimized craft plan of every account"""
+    accounts = await db.accounts.find({}, CRAFT_PROJECTION).to_list(None)
+    return [
+        {"id": account["id"], "name": account["name"], **optimize_craft(account)}
+        for account in accounts
+    ]
+
+@api_router.get("/craft/summary")
+async def get_craft_summary():
+    """Legendary objective progress of every account, read from the stored craft_summary"""
+    accounts = await db.accounts.find(
+        {}, {"_id": 0, "id": 1, "name": 1, "craft_summary": 1}
+    ).to_list(None)
     
-    updated_account = await db.accounts.find_one({"id": account_id}, {"_id": 0})
-    prices = await get_boss_prices()
-    total_usd = calculate_account_usd(updated_account, prices)
+    # Accounts the startup backfill has not reached yet are summarized on the fly, not stored
+    stale_ids = [account["id"] for account in accounts if "craft_summary" not in account]
+    if stale_ids:
+        stale = await db.accounts.find({"id": {"$in": stale_ids}}, CRAFT_PROJECTION).to_list(None)
+        computed = {account["id"]: summary for account, summary in zip(stale, summarize_craft(stale))}
+        for account in accounts:
+            if account["id"] in computed:
+                account["craft_summary"] = computed[account["id"]]
     
-    return {**updated_account, "total_usd": total_usd}
+    summary = []
+    for account in accounts:
+        craft_summary = account.get("craft_summary")
+        if not craft_summary:
+            continue
+        summary.append({
+            "id": account["id"],
+            "name": account["name"],
+            "closest": craft_summary["closest"],
+            "percentages": {key: objective["percentage"] for key, objective in craft_summary["objectives"].items()},
+            "bottlenecks": {key: objective["bottleneck"] for key, objective in craft_summary["objectives"].items()}
+        })
+    
+    objectives = {}
+    for key in OBJECTIVES:
+        percentages = [row["percentages"][key] for row in summary]
+        objectives[key] = {
+            "completed": sum(1 for percentage in percentages if percentage >= 100),
+            "closest_for": sum(1 for row in summary if row["closest"] == key),
+            "average_percentage": round(sum(percentages) / len(percentages), 2) if percentages else 0
+        }
+    
+    return {"accounts": summary, "objectives": objectives}
 
 @api_router.delete("/accounts/{account_id}")
 async def delete_account(account_id: str):
-    result = await db.accounts.delete_one({"id": account_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Account not found")
+    async with account_write() as write:
+        deleted = await db.accounts.find_one_and_delete({"id": account_id}, projection={"_id": 0})
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Account not found")
+        await db.account_tombstones.insert_one({
+            "id": account_id,
+            "updated_seq": write.seq,
+            "deleted_at": datetime.now(timezone.utc)
+        })
+        write.add_fleet_delta(fleet_delta(deleted, None))
+    schedule_expiry({"id": account_id})
+    change_hub.publish({"type": "deleted", "id": account_id, "seq": write.seq})
     return {"message": "Account deleted successfully"}
 
 app.include_router(api_router)
 
+class VaryEncodingMiddleware:
+    """Add Vary: Accept-Encoding to every response that carries an ETag.
+
+    BrotliMiddleware only adds it to the responses it compresses; a cache
+    revalidating an uncompressed one must still keep it apart from the
+    compressed variants sharing its (weak) ETag.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_vary(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "etag" in headers and "accept-encoding" not in headers.get("vary", "").lower():
+                    headers.add_vary_header("Accept-Encoding")
+            await send(message)
+
+        await self.app(scope, receive, send_with_vary)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-After", "ETag"],
+)
+
+# br (gzip fallback) above the size threshold; the SSE stream must not be buffered
+app.add_middleware(
+    BrotliMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1000')),
+    excluded_handlers=["^/api/events$"],
 )
+# Outermost, so it sees the Vary header BrotliMiddleware may have set
+app.add_middleware(VaryEncodingMiddleware)
@@ -0,0 +1,55 @@
+"""
+Account Delta Sync Tests
+Tests GET /api/accounts/changes?since=N (upserts and deletions after a sequence number)
+"""
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def latest_seq():
+    """Drain the change feed and return the current sequence number"""
+    since = 0
+    while True:
+        data = requests.get(f"{BASE_URL}/api/accounts/changes", params={"since": since}).json()
+        since = data["until"]
+        if not data["has_more"]:
+            return since
+
+
+class TestAccountChanges:
+    """Test delta sync of accounts"""
+    
+    def test_changes_since_returns_only_new_writes(self):
+        """Writes after `since` show up as upserts, deletes as deletions"""
+        since = latest_seq()
+        
+        account_data = {"name": f"TEST_Changes_{uuid.uuid4().hex[:8]}", "bosses": {}, "special_bosses": {}}
+        created = requests.post(f"{BASE_URL}/api/accounts", json=account_data).json()
+        requests.put(f"{BASE_URL}/api/accounts/{created['id']}", json={"gold": 42})
+        
+        response = requests.get(f"{BASE_URL}/api/accounts/changes", params={"since": since})
+        assert response.status_code == 200
+        data = response.json()
+        upserts = {account["id"]: account for account in data["upserts"]}
+        assert created["id"] in upserts
+        assert upserts[created["id"]]["gold"] == 42
+        assert "total_usd" in upserts[created["id"]]
+        assert data["until"] > since
+        
+        since = data["until"]
+        requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
+        
+        data = requests.get(f"{BASE_URL}/api/accounts/changes", params={"since": since}).json()
+        assert created["id"] in data["deletions"]
+        assert created["id"] not in {account["id"] for account in data["upserts"]}
+        print(f"Delta sync: until={data['until']}")
+    
+    def test_no_changes(self):
+        """Nothing after the latest sequence"""
+        since = latest_seq()
+        data = requests.get(f"{BASE_URL}/api/accounts/changes", params={"since": since}).json()
+        assert data["until"] >= since
+        assert data["has_more"] is False
@@ -0,0 +1,61 @@
+"""
+Account Live Events Tests
+Tests GET /api/events (Server-Sent Events stream of account changes)
+"""
+import requests
+import os
+import json
+import threading
+import time
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def read_events(response, count, events):
+    """Collect `count` SSE events (type and parsed data) from a streaming response"""
+    event_type = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event_type = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event_type, json.loads(line[len("data: "):])))
+            if len(events) >= count:
+                return
+
+
+class TestAccountEvents:
+    """Test the live account change stream"""
+    
+    def test_stream_receives_account_changes(self):
+        """Create, update and delete of an account are pushed as events"""
+        response = requests.get(f"{BASE_URL}/api/events", stream=True, timeout=30)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        
+        events = []
+        reader = threading.Thread(target=read_events, args=(response, 3, events), daemon=True)
+        reader.start()
+        time.sleep(0.5)
+        
+        account_data = {"name": f"TEST_Events_{uuid.uuid4().hex[:8]}", "bosses": {}, "special_bosses": {}}
+        created = requests.post(f"{BASE_URL}/api/accounts", json=account_data).json()
+        requests.put(f"{BASE_URL}/api/accounts/{created['id']}", json={"gold": 7})
+        requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
+        
+        reader.join(timeout=10)
+        response.close()
+        own = [(kind, data) for kind, data in events if data.get("id") == created["id"]]
+        assert [kind for kind, _ in own] == ["created", "updated", "deleted"]
+        assert own[0][1]["account"]["name"] == account_data["name"]
+        assert own[1][1]["changes"]["gold"] == 7
+        print(f"Events received: {[kind for kind, _ in own]}")
+    
+    def test_events_status(self):
+        """Hub status reports subscribers and evictions"""
+        response = requests.get(f"{BASE_URL}/api/events/status")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["queue_size"] > 0
+        assert "subscribers" in data
+        assert "evictions" in data
@@ -0,0 +1,174 @@
+"""
+Account Listing Tests
+Tests keyset pagination (?after=&limit=), NDJSON streaming, projections and value sorting on GET /api/accounts
+"""
+import pytest
+import requests
+import os
+import json
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+class TestAccountsListing:
+    """Test paginated and streamed account listing"""
+    
+    @pytest.fixture
+    def test_accounts(self):
+        """Create a few accounts and delete them after the test"""
+        created = []
+        for i in range(3):
+            account_data = {
+                "name": f"TEST_Listing_{uuid.uuid4().hex[:8]}",
+                "bosses": {"medio2": i},
+                "special_bosses": {}
+            }
+            response = requests.post(f"{BASE_URL}/api/accounts", json=account_data)
+            assert response.status_code == 200
+            created.append(response.json())
+        yield created
+        for account in created:
+            requests.delete(f"{BASE_URL}/api/accounts/{account['id']}")
+    
+    def test_keyset_pagination_visits_every_account_once(self, test_accounts):
+        """Walking pages of 2 via X-Next-After returns each account exactly once, ordered by id"""
+        seen = []
+        after = None
+        while True:
+            params = {"limit": 2}
+            if after:
+                params["after"] = after
+            response = requests.get(f"{BASE_URL}/api/accounts", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page) <= 2
+            seen.extend(account["id"] for account in page)
+            after = response.headers.get("X-Next-After")
+            if not after:
+                break
+        
+        assert seen == sorted(seen)
+        assert len(seen) == len(set(seen))
+        for account in test_accounts:
+            assert account["id"] in seen
+        print(f"Paginated through {len(seen)} accounts")
+    
+    def test_limit_is_validated(self):
+        """Limits outside 1..1000 are rejected"""
+        assert requests.get(f"{BASE_URL}/api/accounts", params={"limit": 0}).status_code == 422
+        assert requests.get(f"{BASE_URL}/api/accounts", params={"limit": 5000}).status_code == 422
+    
+    def test_ndjson_stream_matches_list(self, test_accounts):
+        """format=ndjson streams one valued account per line"""
+        response = requests.get(f"{BASE_URL}/api/accounts", params={"format": "ndjson"}, stream=True)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        
+        streamed = [json.loads(line) for line in response.iter_lines() if line]
+        by_id = {account["id"]: account for account in streamed}
+        for account in test_accounts:
+            assert account["id"] in by_id
+            assert by_id[account["id"]]["total_usd"] == account["total_usd"]
+        
+        listed = requests.get(f"{BASE_URL}/api/accounts").json()
+        assert len(listed) == len(streamed)
+        print(f"Streamed {len(streamed)} accounts")
+    
+    def test_fields_projection(self, test_accounts):
+        """fields= returns only the requested fields, plus id and total_usd"""
+        response = requests.get(f"{BASE_URL}/api/accounts", params={"fields": "name,gold"})
+        assert response.status_code == 200
+        by_id = {account["id"]: account for account in response.json()}
+        for account in test_accounts:
+            assert set(by_id[account["id"]]) == {"id", "name", "gold", "total_usd"}
+            assert by_id[account["id"]]["total_usd"] == account["total_usd"]
+        
+        single = requests.get(f"{BASE_URL}/api/accounts/{test_accounts[0]['id']}", params={"fields": "name"}).json()
+        assert set(single) == {"id", "name", "total_usd"}
+    
+    def test_dashboard_view(self, test_accounts):
+        """view=dashboard leaves out materials and craft data"""
+        response = requests.get(f"{BASE_URL}/api/accounts", params={"view": "dashboard"})
+        assert response.status_code == 200
+        for account in response.json():
+            assert "materials" not in account
+            assert "craft_resources" not in account
+            assert "craft_summary" not in account
+            assert "bosses" in account
+            assert "total_usd" in account
+    
+    def test_unknown_fields_rejected(self):
+        assert requests.get(f"{BASE_URL}/api/accounts", params={"fields": "name,unknown"}).status_code == 400
+        assert requests.get(f"{BASE_URL}/api/accounts", params={"view": "unknown"}).status_code == 422
+    
+    def test_raw_read_path_matches(self, test_accounts):
+        """raw=true returns the same accounts as the default path"""
+        default = requests.get(f"{BASE_URL}/api/accounts").json()
+        response = requests.get(f"{BASE_URL}/api/accounts", params={"raw": "true"})
+        assert response.status_code == 200
+        raw = response.json()
+        assert {account["id"]: account for account in raw} == {account["id"]: account for account in default}
+        
+        dashboard = requests.get(f"{BASE_URL}/api/accounts", params={"raw": "true", "view": "dashboard"}).json()
+        assert all("materials" not in account and "total_usd" in account for account in dashboard)
+    
+    def test_sort_by_value_pages_in_order(self, test_accounts):
+        """sort=-total_usd pages through accounts by descending value"""
+        seen = []
+        after = None
+        while True:
+            params = {"sort": "-total_usd", "limit": 2, "fields": "name"}
+            if after:
+                params["after"] = after
+            response = requests.get(f"{BASE_URL}/api/accounts", params=params)
+            assert response.status_code == 200
+            seen.extend(response.json())
+            after = response.headers.get("X-Next-After")
+            if not after:
+                break
+        
+        values = [account["total_usd"] for account in seen]
+        assert values == sorted(values, reverse=True)
+        assert len({account["id"] for account in seen}) == len(seen)
+        for account in test_accounts:
+            assert account["id"] in {account["id"] for account in seen}
+    
+    def test_value_range_filter(self, test_accounts):
+        """min_usd/max_usd keep only accounts valued in the range"""
+        low = min(account["total_usd"] for account in test_accounts)
+        high = max(account["total_usd"] for account in test_accounts)
+        response = requests.get(f"{BASE_URL}/api/accounts", params={"min_usd": low, "max_usd": high})
+        assert response.status_code == 200
+        accounts = response.json()
+        assert all(low <= account["total_usd"] <= high for account in accounts)
+        for account in test_accounts:
+            assert account["id"] in {account["id"] for account in accounts}
+    
+    def test_usd_summary(self, test_accounts):
+        """Server-side sum of total_usd matches the listed values"""
+        accounts = requests.get(f"{BASE_URL}/api/accounts").json()
+        response = requests.get(f"{BASE_URL}/api/accounts/usd-summary")
+        assert response.status_code == 200
+        summary = response.json()
+        assert summary["accounts"] == len(accounts)
+        assert summary["total_usd"] == pytest.approx(sum(account["total_usd"] for account in accounts), abs=0.01)
+        assert summary["max_usd"] == max(account["total_usd"] for account in accounts)
+    
+    def test_value_sort_follows_price_change(self, test_accounts):
+        """Stored values are recomputed when a price changes"""
+        original = requests.get(f"{BASE_URL}/api/boss-prices").json()["medio2_price"]
+        try:
+            # 0.005 puts odd kill counts exactly on a half cent: every path must round it alike
+            for price in (original + 100, 0.005):
+                requests.put(f"{BASE_URL}/api/boss-prices", json={"medio2_price": price})
+                by_value = requests.get(f"{BASE_URL}/api/accounts", params={"sort": "-total_usd"}).json()
+                listed = {account["id"]: account["total_usd"] for account in requests.get(f"{BASE_URL}/api/accounts").json()}
+                for account in by_value:
+                    assert account["total_usd"] == listed[account["id"]]
+                    single = requests.get(f"{BASE_URL}/api/accounts/{account['id']}").json()
+                    assert single["total_usd"] == account["total_usd"]
+                values = [account["total_usd"] for account in by_value]
+                assert values == sorted(values, reverse=True)
+        finally:
+            requests.put(f"{BASE_URL}/api/boss-prices", json={"medio2_price": original})
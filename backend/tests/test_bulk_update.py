@@ -0,0 +1,74 @@
+"""
+Bulk Update Tests
+Tests PATCH /api/accounts/bulk (many {id, changes} edits in one request)
+"""
+import pytest
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+class TestBulkUpdate:
+    """Test batch edits of inline table changes"""
+    
+    @pytest.fixture
+    def test_accounts(self):
+        """Create two accounts and delete them after the test"""
+        created = []
+        for _ in range(2):
+            account_data = {
+                "name": f"TEST_Bulk_{uuid.uuid4().hex[:8]}",
+                "bosses": {},
+                "special_bosses": {}
+            }
+            response = requests.post(f"{BASE_URL}/api/accounts", json=account_data)
+            assert response.status_code == 200
+            created.append(response.json())
+        yield created
+        for account in created:
+            requests.delete(f"{BASE_URL}/api/accounts/{account['id']}")
+    
+    def test_bulk_update_applies_all_changes(self, test_accounts):
+        """Every entry is applied and returned with a recomputed total_usd"""
+        prices = requests.get(f"{BASE_URL}/api/boss-prices").json()
+        first, second = test_accounts
+        edits = [
+            {"id": first["id"], "changes": {"bosses": {"medio2": 10}}},
+            {"id": second["id"], "changes": {"gold": 250}},
+            {"id": first["id"], "changes": {"sala_pico": "Sala 7"}}
+        ]
+        response = requests.patch(f"{BASE_URL}/api/accounts/bulk", json=edits)
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert data["not_found"] == []
+        by_id = {account["id"]: account for account in data["accounts"]}
+        assert by_id[first["id"]]["bosses"]["medio2"] == 10
+        assert by_id[first["id"]]["sala_pico"] == "Sala 7"
+        assert by_id[first["id"]]["total_usd"] == round(10 * prices["medio2_price"], 2)
+        assert by_id[second["id"]]["gold"] == 250
+        
+        # Persisted
+        fetched = requests.get(f"{BASE_URL}/api/accounts/{second['id']}").json()
+        assert fetched["gold"] == 250
+        print(f"Bulk updated {len(data['accounts'])} accounts")
+    
+    def test_bulk_update_reports_unknown_ids(self, test_accounts):
+        """Unknown ids are listed in not_found instead of failing the batch"""
+        edits = [
+            {"id": test_accounts[0]["id"], "changes": {"gold": 1}},
+            {"id": "does-not-exist", "changes": {"gold": 1}}
+        ]
+        response = requests.patch(f"{BASE_URL}/api/accounts/bulk", json=edits)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["not_found"] == ["does-not-exist"]
+        assert len(data["accounts"]) == 1
+    
+    def test_bulk_update_validates_changes(self, test_accounts):
+        """Invalid values reject the whole request"""
+        edits = [{"id": test_accounts[0]["id"], "changes": {"gold": -5}}]
+        response = requests.patch(f"{BASE_URL}/api/accounts/bulk", json=edits)
+        assert response.status_code == 422
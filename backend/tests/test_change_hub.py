@@ -0,0 +1,57 @@
+"""
+Change Hub Tests
+Unit tests of events.ChangeHub (in-process fan-out behind GET /api/events)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from events import ChangeHub
+
+
+def drain(subscriber):
+    events = []
+    while not subscriber.queue.empty():
+        events.append(subscriber.queue.get_nowait())
+    return events
+
+
+class TestChangeHub:
+    """Test fan-out and eviction of slow subscribers"""
+
+    def test_publish_reaches_every_subscriber(self):
+        hub = ChangeHub(queue_size=10)
+        first, second = hub.subscribe(), hub.subscribe()
+        hub.publish({"type": "deleted", "id": "a"})
+        assert drain(first) == [{"type": "deleted", "id": "a"}]
+        assert drain(second) == [{"type": "deleted", "id": "a"}]
+
+    def test_slow_subscriber_is_evicted(self):
+        """A full queue evicts its subscriber without blocking the others"""
+        hub = ChangeHub(queue_size=2)
+        fast, slow = hub.subscribe(), hub.subscribe()
+
+        for index in range(3):
+            hub.publish({"type": "updated", "id": str(index)})
+            # Only the fast subscriber keeps up
+            assert drain(fast) == [{"type": "updated", "id": str(index)}]
+
+        assert slow.evicted
+        assert not fast.evicted
+        # The backlog is dropped for a single eviction notice
+        assert drain(slow) == [{"type": "evicted"}]
+        assert hub.stats() == {"subscribers": 1, "queue_size": 2, "evictions": 1}
+
+        # Later events only reach the remaining subscriber
+        hub.publish({"type": "deleted", "id": "x"})
+        assert drain(fast) == [{"type": "deleted", "id": "x"}]
+        assert drain(slow) == []
+
+    def test_unsubscribe(self):
+        hub = ChangeHub(queue_size=2)
+        subscriber = hub.subscribe()
+        hub.unsubscribe(subscriber)
+        assert not hub.has_subscribers
+        hub.publish({"type": "deleted", "id": "a"})
+        assert drain(subscriber) == []
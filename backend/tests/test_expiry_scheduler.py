@@ -0,0 +1,104 @@
+"""
+Expiry Scheduler Tests
+Unit tests of expiry.ExpiryScheduler (the heap of confirmation deadlines behind the reset job)
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from expiry import ExpiryScheduler
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+async def never_called(ids, now):
+    raise AssertionError("reset_due should not run")
+
+
+class TestExpiryScheduler:
+    """Test deadline ordering, stale heap entries and retries"""
+
+    def test_pops_due_ids_in_deadline_order(self):
+        scheduler = ExpiryScheduler(never_called)
+        scheduler.load([
+            ("c", NOW + timedelta(minutes=3)),
+            ("a", NOW + timedelta(minutes=1)),
+            ("d", NOW + timedelta(minutes=10)),
+        ])
+        scheduler.schedule("b", NOW + timedelta(minutes=2))
+
+        assert scheduler.next_deadline() == NOW + timedelta(minutes=1)
+        assert scheduler.pop_due(NOW) == []
+        assert scheduler.pop_due(NOW + timedelta(minutes=5)) == ["a", "b", "c"]
+        assert scheduler.next_deadline() == NOW + timedelta(minutes=10)
+        assert scheduler.stats()["pending"] == 1
+
+    def test_skips_stale_entries(self):
+        """Rescheduled and cleared accounts leave entries behind that never fire"""
+        scheduler = ExpiryScheduler(never_called)
+        scheduler.schedule("moved", NOW + timedelta(minutes=1))
+        scheduler.schedule("cleared", NOW + timedelta(minutes=2))
+        scheduler.schedule("kept", NOW + timedelta(minutes=3))
+
+        scheduler.schedule("moved", NOW + timedelta(minutes=20))
+        scheduler.schedule("cleared", None)
+
+        assert scheduler.next_deadline() == NOW + timedelta(minutes=3)
+        assert scheduler.pop_due(NOW + timedelta(minutes=10)) == ["kept"]
+        assert scheduler.pop_due(NOW + timedelta(minutes=30)) == ["moved"]
+        assert scheduler.next_deadline() is None
+
+    def test_fires_due_ids_and_retries_after_failure(self):
+        """A failed reset is retried retry_after later; a successful one is not repeated"""
+        calls = []
+
+        async def reset_due(ids, now):
+            calls.append(ids)
+            if len(calls) == 1:
+                raise RuntimeError("database unavailable")
+            return len(ids)
+
+        async def run():
+            scheduler = ExpiryScheduler(reset_due, retry_after=timedelta(milliseconds=100))
+            past = datetime.now(timezone.utc) - timedelta(seconds=1)
+            scheduler.load([("a", past), ("b", past + timedelta(milliseconds=1))])
+            scheduler.start()
+            try:
+                await asyncio.sleep(0.05)
+                assert calls == [["a", "b"]]
+                # Rescheduled for the retry, not dropped
+                assert scheduler.stats()["pending"] == 2
+
+                await asyncio.sleep(0.3)
+                assert calls == [["a", "b"], ["a", "b"]]
+                assert scheduler.stats()["pending"] == 0
+            finally:
+                await scheduler.stop()
+
+        asyncio.run(run())
+
+    def test_earlier_deadline_wakes_the_task(self):
+        calls = []
+
+        async def reset_due(ids, now):
+            calls.append(ids)
+            return len(ids)
+
+        async def run():
+            scheduler = ExpiryScheduler(reset_due)
+            scheduler.schedule("later", datetime.now(timezone.utc) + timedelta(hours=1))
+            scheduler.start()
+            try:
+                await asyncio.sleep(0.05)
+                scheduler.schedule("soon", datetime.now(timezone.utc) + timedelta(milliseconds=50))
+                await asyncio.sleep(0.2)
+                assert calls == [["soon"]]
+                assert scheduler.running
+            finally:
+                await scheduler.stop()
+            assert not scheduler.running
+
+        asyncio.run(run())
@@ -0,0 +1,77 @@
+"""
+Field-Level Account Update Tests
+Tests PATCH /api/accounts/{id} (dotted-path $set and atomic $inc)
+"""
+import pytest
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+class TestFieldLevelUpdates:
+    """Test targeted $set/$inc edits"""
+    
+    @pytest.fixture
+    def account(self):
+        """A throwaway account, deleted after the test"""
+        account_data = {
+            "name": f"TEST_Fields_{uuid.uuid4().hex[:8]}",
+            "bosses": {"medio2": 10, "grande4": 1},
+            "special_bosses": {"xama": 2}
+        }
+        created = requests.post(f"{BASE_URL}/api/accounts", json=account_data).json()
+        yield created
+        requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
+    
+    def test_set_and_inc_only_touch_given_paths(self, account):
+        """Set one boss and increment another; the rest of the sub-document is kept"""
+        response = requests.patch(f"{BASE_URL}/api/accounts/{account['id']}", json={
+            "set": {"bosses.medio6": 3},
+            "inc": {"bosses.grande4": 1, "special_bosses.xama": 1}
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["bosses"]["medio2"] == 10
+        assert data["bosses"]["medio6"] == 3
+        assert data["bosses"]["grande4"] == 2
+        assert data["special_bosses"]["xama"] == 3
+        assert "total_usd" in data
+    
+    def test_concurrent_increments_are_not_lost(self, account):
+        """Each +1 is applied atomically"""
+        for _ in range(5):
+            requests.patch(f"{BASE_URL}/api/accounts/{account['id']}", json={"inc": {"bosses.grande4": 1}})
+        data = requests.get(f"{BASE_URL}/api/accounts/{account['id']}").json()
+        assert data["bosses"]["grande4"] == 6
+    
+    def test_decrement_below_zero_conflicts(self, account):
+        """A decrement past zero is refused and nothing changes"""
+        response = requests.patch(f"{BASE_URL}/api/accounts/{account['id']}", json={"inc": {"bosses.grande4": -2}})
+        assert response.status_code == 409
+        data = requests.get(f"{BASE_URL}/api/accounts/{account['id']}").json()
+        assert data["bosses"]["grande4"] == 1
+    
+    def test_invalid_paths_rejected(self, account):
+        """Unknown paths, non-numeric increments and set+inc of one path are 422"""
+        for body in (
+            {"set": {"bosses.unknown": 1}},
+            {"inc": {"name": 1}},
+            {"set": {"bosses.medio2": -1}},
+            {"set": {"gold": 1}, "inc": {"gold": 1}},
+        ):
+            response = requests.patch(f"{BASE_URL}/api/accounts/{account['id']}", json=body)
+            assert response.status_code == 422, body
+    
+    def test_patch_missing_account(self):
+        response = requests.patch(f"{BASE_URL}/api/accounts/non-existent-id-12345", json={"inc": {"gold": 1}})
+        assert response.status_code == 404
+    
+    def test_put_partial_sub_document_merges(self, account):
+        """PUT with part of a sub-document only updates the fields sent"""
+        response = requests.put(f"{BASE_URL}/api/accounts/{account['id']}", json={"bosses": {"medio6": 4}})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["bosses"]["medio6"] == 4
+        assert data["bosses"]["medio2"] == 10
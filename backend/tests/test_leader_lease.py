@@ -0,0 +1,121 @@
+"""
+Leader Lease Tests
+Unit tests of leader.LeaderLease against the configured MongoDB (MONGO_URL / DB_NAME),
+each in a throwaway collection
+"""
+import asyncio
+import os
+import sys
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from leader import LeaderLease
+
+MONGO_URL = os.environ.get('MONGO_URL')
+
+pytestmark = pytest.mark.skipif(not MONGO_URL, reason="MONGO_URL is not set")
+
+
+async def nothing():
+    pass
+
+
+def make_lease(ttl: timedelta, on_elected=nothing, on_demoted=nothing) -> LeaderLease:
+    return LeaderLease("test", ttl, on_elected=on_elected, on_demoted=on_demoted)
+
+
+def with_leases(test):
+    """Run test(collection) on a fresh lease collection with the unique id index"""
+    async def run():
+        client = AsyncIOMotorClient(MONGO_URL)
+        collection = client[os.environ.get('DB_NAME', 'test')][f"test_leases_{uuid.uuid4().hex[:8]}"]
+        await collection.create_index("id", unique=True)
+        try:
+            await test(collection)
+        finally:
+            await collection.drop()
+            client.close()
+    asyncio.run(run())
+
+
+class TestLeaderLease:
+    """Test acquiring, renewing, taking over and releasing the lease"""
+
+    def test_acquire_and_renew(self):
+        async def test(collection):
+            lease = make_lease(timedelta(seconds=30))
+            lease._collection = collection
+            assert await lease.try_acquire()
+            first_expiry = lease.expires_at
+
+            await asyncio.sleep(0.01)
+            assert await lease.try_acquire()
+            assert lease.expires_at > first_expiry
+            assert await collection.count_documents({"id": "test"}) == 1
+        with_leases(test)
+
+    def test_live_lease_blocks_others(self):
+        async def test(collection):
+            leader, other = make_lease(timedelta(seconds=30)), make_lease(timedelta(seconds=30))
+            leader._collection = other._collection = collection
+            assert await leader.try_acquire()
+            assert not await other.try_acquire()
+            # The holder keeps renewing
+            assert await leader.try_acquire()
+        with_leases(test)
+
+    def test_takeover_after_ttl(self):
+        async def test(collection):
+            leader, other = make_lease(timedelta(milliseconds=200)), make_lease(timedelta(seconds=30))
+            leader._collection = other._collection = collection
+            assert await leader.try_acquire()
+            assert not await other.try_acquire()
+
+            await asyncio.sleep(0.3)
+            assert await other.try_acquire()
+            assert not await leader.try_acquire()
+        with_leases(test)
+
+    def test_release_frees_the_lease(self):
+        async def test(collection):
+            leader, other = make_lease(timedelta(seconds=30)), make_lease(timedelta(seconds=30))
+            leader._collection = other._collection = collection
+            assert await leader.try_acquire()
+            # Only the holder can release
+            await other.release()
+            assert not await other.try_acquire()
+
+            await leader.release()
+            assert await other.try_acquire()
+        with_leases(test)
+
+    def test_start_elects_and_stop_steps_down(self):
+        async def test(collection):
+            changes = []
+
+            async def elected():
+                changes.append("elected")
+
+            async def demoted():
+                changes.append("demoted")
+
+            lease = make_lease(timedelta(seconds=3), on_elected=elected, on_demoted=demoted)
+            lease.start(collection)
+            for _ in range(50):
+                if lease.is_leader:
+                    break
+                await asyncio.sleep(0.02)
+            assert lease.is_leader
+            assert lease.stats()["elections"] == 1
+
+            await lease.stop()
+            assert not lease.is_leader
+            assert changes == ["elected", "demoted"]
+            assert await collection.count_documents({"id": "test"}) == 0
+        with_leases(test)
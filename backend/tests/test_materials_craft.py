@@ -415,6 +415,112 @@ class TestCraftChainCalculation:
         print("  Progress depends on craft chain calculation with shared resources")
 
 
+class TestCraftEndpoints:
+    """Test server-side craft evaluation (GET /api/accounts/{id}/craft, GET /api/craft/summary)"""
+    
+    @pytest.fixture
+    def craft_account(self):
+        """Account from the craft chain example: Aço 1000R/50E/100L, 5000 Pó, 500k DS, 2M Cobre"""
+        account_data = {
+            "name": f"TEST_CraftEngine_{uuid.uuid4().hex[:8]}",
+            "bosses": {},
+            "special_bosses": {},
+            "materials": {
+                "aco": {"raro": 1000, "epico": 50, "lendario": 100},
+                "esfera": {"raro": 0, "epico": 0, "lendario": 100},
+                "lunar": {"raro": 0, "epico": 0, "lendario": 100}
+            },
+            "craft_resources": {"po": 5000, "ds": 500000, "cobre": 2000000}
+        }
+        response = requests.post(f"{BASE_URL}/api/accounts", json=account_data)
+        assert response.status_code == 200
+        created = response.json()
+        yield created
+        requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
+    
+    def test_account_craft_chain(self, craft_account):
+        """DS and Cobre run out after crafting épicos, so Aço stays at 100 lendários"""
+        response = requests.get(f"{BASE_URL}/api/accounts/{craft_account['id']}/craft")
+        assert response.status_code == 200
+        data = response.json()
+        
+        arma = data["objectives"]["arma"]
+        aco = arma["ingredients"][0]
+        assert aco["key"] == "aco"
+        assert aco["craft_details"]["epicos_craftados"] == 100
+        assert aco["craft_details"]["lend_craftados"] == 0
+        assert aco["have"] == 100
+        assert aco["missing"] == 200
+        assert arma["percentage"] == 33
+        assert arma["remaining_resources"] == {"po": 2500, "ds": 0, "cobre": 0}
+        assert data["closest"] == "arma"
+        print(f"Arma progress: {arma['percentage']}%")
+    
+    def test_craft_summary_is_persisted_and_refreshed(self, craft_account):
+        """craft_summary is stored on create and recomputed when materials change"""
+        assert craft_account["craft_summary"]["craftable"]["aco"] == 100
+        assert craft_account["craft_summary"]["objectives"]["arma"]["percentage"] == 33
+        
+        update_data = {"materials": {
+            "aco": {"raro": 0, "epico": 0, "lendario": 300},
+            "esfera": {"raro": 0, "epico": 0, "lendario": 100},
+            "lunar": {"raro": 0, "epico": 0, "lendario": 100}
+        }}
+        response = requests.put(f"{BASE_URL}/api/accounts/{craft_account['id']}", json=update_data)
+        assert response.status_code == 200
+        
+        fetched = requests.get(f"{BASE_URL}/api/accounts/{craft_account['id']}").json()
+        assert fetched["craft_summary"]["craftable"]["aco"] == 300
+        assert fetched["craft_summary"]["objectives"]["arma"]["percentage"] == 100
+        assert fetched["craft_summary"]["objectives"]["arma"]["bottleneck"] == []
+    
+    def test_account_craft_not_found(self):
+        response = requests.get(f"{BASE_URL}/api/accounts/does-not-exist/craft")
+        assert response.status_code == 404
+    
+    def test_craft_summary(self, craft_account):
+        """Summary lists every account with its per-objective percentage"""
+        response = requests.get(f"{BASE_URL}/api/craft/summary")
+        assert response.status_code == 200
+        data = response.json()
+        
+        row = next(row for row in data["accounts"] if row["id"] == craft_account["id"])
+        assert row["percentages"]["arma"] == 33
+        assert row["closest"] == "arma"
+        assert set(data["objectives"]) == {"arma", "torso", "colar"}
+        print(f"Craft summary objectives: {data['objectives']}")
+    
+    def test_craft_plan_shares_aco_between_arma_and_torso(self):
+        """Arma and Torso both need 300 Aço L: the optimizer must not count the same Aço twice"""
+        account_data = {
+            "name": f"TEST_CraftPlan_{uuid.uuid4().hex[:8]}",
+            "bosses": {},
+            "special_bosses": {},
+            "materials": {
+                "aco": {"raro": 0, "epico": 0, "lendario": 300},
+                "esfera": {"raro": 0, "epico": 0, "lendario": 100},
+                "lunar": {"raro": 0, "epico": 0, "lendario": 100},
+                "quintessencia": {"raro": 0, "epico": 0, "lendario": 100},
+                "bugiganga": {"raro": 0, "epico": 0, "lendario": 100}
+            },
+            "craft_resources": {"po": 0, "ds": 0, "cobre": 0}
+        }
+        created = requests.post(f"{BASE_URL}/api/accounts", json=account_data).json()
+        try:
+            response = requests.get(f"{BASE_URL}/api/accounts/{created['id']}/craft/plan")
+            assert response.status_code == 200
+            plan = response.json()
+            
+            # Each objective alone is 100%, but only one can be completed
+            assert plan["completed"] == ["arma"]
+            assert plan["steps"] == []
+            assert "torso" in plan["missing"]
+            assert plan["missing"]["torso"]["raro"]["aco"] == 30000
+            print(f"Craft plan: {plan}")
+        finally:
+            requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
+
+
 class TestCleanupMaterials:
     """Cleanup test data"""
     
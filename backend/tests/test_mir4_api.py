@@ -6,6 +6,7 @@ import pytest
 import requests
 import os
 import uuid
+from datetime import datetime, timedelta
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
 
@@ -29,7 +30,22 @@ class TestHealthAndScheduler:
         assert "scheduler_running" in data
         assert data["scheduler_running"] == True
         assert "jobs" in data
+        # Background jobs run in the worker holding the scheduler lease only
+        assert "is_leader" in data["leader"]
+        if data["leader"]["is_leader"]:
+            assert "reconcile_fleet_totals" in [job["id"] for job in data["jobs"]]
         print(f"Scheduler status: {data}")
+    
+    def test_index_status(self):
+        """Test index status endpoint - startup indexes should exist"""
+        response = requests.get(f"{BASE_URL}/api/index-status")
+        assert response.status_code == 200
+        data = response.json()
+        assert "id_unique" in data["accounts"]["indexes"]
+        assert "confirmed_reset_at" in data["accounts"]["indexes"]
+        assert "id_unique" in data["boss_prices"]["indexes"]
+        assert data["accounts"]["missing"] == []
+        print(f"Index status: {data}")
 
 
 class TestBossPrices:
@@ -221,6 +237,19 @@ class TestAccountsCRUD:
         assert fetched["confirmed"] == True
         assert fetched["confirmed_at"] is not None
         
+        # Dates are stored as BSON dates but still emitted as ISO strings
+        confirmed_at = datetime.fromisoformat(fetched["confirmed_at"])
+        assert confirmed_at.tzinfo is not None
+        # The expiry deadline is stored with the confirmation and scheduled
+        assert datetime.fromisoformat(fetched["reset_at"]) - confirmed_at == timedelta(days=30)
+        status = requests.get(f"{BASE_URL}/api/scheduler-status").json()
+        # Only the worker holding the scheduler lease runs (and answers for) the expiry scheduler
+        if status["leader"]["is_leader"]:
+            assert status["expiry"]["running"] == True
+            assert datetime.fromisoformat(status["expiry"]["next_reset_at"]) <= datetime.fromisoformat(fetched["reset_at"])
+        assert isinstance(fetched["created_at"], str)
+        datetime.fromisoformat(fetched["created_at"])
+        
         print(f"Confirmed account: {account_id}, confirmed_at: {fetched['confirmed_at']}")
         
         # Cleanup
@@ -301,6 +330,110 @@ class TestUSDCalculation:
         requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
 
 
+class TestConditionalGet:
+    """Test ETag / If-None-Match on account and boss price reads"""
+    
+    def test_accounts_etag(self):
+        """Unchanged list answers 304; any account write changes the ETag"""
+        response = requests.get(f"{BASE_URL}/api/accounts")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        
+        not_modified = requests.get(f"{BASE_URL}/api/accounts", headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        
+        account_data = {"name": f"TEST_ETag_{uuid.uuid4().hex[:8]}", "bosses": {}, "special_bosses": {}}
+        created = requests.post(f"{BASE_URL}/api/accounts", json=account_data).json()
+        try:
+            modified = requests.get(f"{BASE_URL}/api/accounts", headers={"If-None-Match": etag})
+            assert modified.status_code == 200
+            assert modified.headers["ETag"] != etag
+            
+            single = requests.get(f"{BASE_URL}/api/accounts/{created['id']}")
+            single_etag = single.headers["ETag"]
+            assert requests.get(
+                f"{BASE_URL}/api/accounts/{created['id']}", headers={"If-None-Match": single_etag}
+            ).status_code == 304
+        finally:
+            requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
+    
+    def test_boss_prices_etag(self):
+        """Price updates invalidate the boss prices ETag"""
+        response = requests.get(f"{BASE_URL}/api/boss-prices")
+        etag = response.headers["ETag"]
+        assert requests.get(f"{BASE_URL}/api/boss-prices", headers={"If-None-Match": etag}).status_code == 304
+        assert "Accept-Encoding" in response.headers["Vary"]
+        
+        requests.put(f"{BASE_URL}/api/boss-prices", json={"medio2_price": response.json()["medio2_price"]})
+        assert requests.get(f"{BASE_URL}/api/boss-prices", headers={"If-None-Match": etag}).status_code == 200
+
+
+class TestFleetTotals:
+    """Test materialized fleet totals (GET /api/accounts/totals)"""
+    
+    def test_totals_follow_account_writes(self):
+        """Create, update and delete move the totals by exactly the account's counts"""
+        start = requests.get(f"{BASE_URL}/api/accounts/totals").json()
+        
+        account_data = {
+            "name": f"TEST_Totals_{uuid.uuid4().hex[:8]}",
+            "bosses": {"medio2": 7},
+            "special_bosses": {"xama": 2},
+            "gold": 100
+        }
+        created = requests.post(f"{BASE_URL}/api/accounts", json=account_data).json()
+        after_create = requests.get(f"{BASE_URL}/api/accounts/totals").json()
+        assert after_create["accounts"] == start["accounts"] + 1
+        assert after_create["bosses"]["medio2"] == start["bosses"]["medio2"] + 7
+        assert after_create["special_bosses"]["xama"] == start["special_bosses"]["xama"] + 2
+        assert after_create["gold"] == pytest.approx(start["gold"] + 100)
+        
+        requests.put(f"{BASE_URL}/api/accounts/{created['id']}", json={"gold": 40})
+        after_update = requests.get(f"{BASE_URL}/api/accounts/totals").json()
+        assert after_update["gold"] == pytest.approx(start["gold"] + 40)
+        
+        requests.delete(f"{BASE_URL}/api/accounts/{created['id']}")
+        after_delete = requests.get(f"{BASE_URL}/api/accounts/totals").json()
+        assert after_delete["accounts"] == start["accounts"]
+        assert after_delete["bosses"]["medio2"] == start["bosses"]["medio2"]
+        assert after_delete["gold"] == pytest.approx(start["gold"])
+        print(f"Fleet totals: {after_delete}")
+    
+    def test_totals_match_account_list(self):
+        """Stored totals agree with a full scan of the accounts"""
+        accounts = requests.get(f"{BASE_URL}/api/accounts").json()
+        totals = requests.get(f"{BASE_URL}/api/accounts/totals").json()
+        assert totals["accounts"] == len(accounts)
+        assert totals["gold"] == pytest.approx(sum(account["gold"] for account in accounts))
+        assert "total_usd" in totals
+
+
+class TestDashboard:
+    """Test the dashboard bootstrap endpoint (GET /api/dashboard)"""
+    
+    def test_dashboard_snapshot(self):
+        """Accounts, prices, totals and scheduler status agree with their own endpoints"""
+        response = requests.get(f"{BASE_URL}/api/dashboard")
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"accounts", "boss_prices", "totals", "scheduler"}
+        
+        assert data["boss_prices"] == requests.get(f"{BASE_URL}/api/boss-prices").json()
+        assert data["totals"]["accounts"] == len(data["accounts"])
+        assert data["scheduler"]["scheduler_running"] is True
+        for account in data["accounts"]:
+            assert "total_usd" in account
+            assert "materials" not in account
+    
+    def test_dashboard_etag(self):
+        """A matching If-None-Match is answered with 304"""
+        response = requests.get(f"{BASE_URL}/api/dashboard")
+        etag = response.headers["ETag"]
+        # Weak: the scheduler block holds per-worker state the tag does not cover
+        assert etag.startswith("W/")
+        assert requests.get(f"{BASE_URL}/api/dashboard", headers={"If-None-Match": etag}).status_code == 304
+
+
 class TestCleanup:
     """Cleanup test data"""
     
@@ -0,0 +1,83 @@
+"""
+Price Profile Tests
+Tests named boss price profiles (/api/boss-prices/{profile}) and
+GET /api/accounts/valuations (every account valued under several profiles)
+"""
+import pytest
+import requests
+import os
+import uuid
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+class TestPriceProfiles:
+    """Test price profile CRUD and multi-profile valuation"""
+    
+    @pytest.fixture
+    def test_profile(self):
+        """Create a price profile and delete it after the test"""
+        name = f"test_{uuid.uuid4().hex[:8]}"
+        response = requests.put(f"{BASE_URL}/api/boss-prices/{name}", json={"medio2_price": 2.0})
+        assert response.status_code == 200
+        yield name
+        requests.delete(f"{BASE_URL}/api/boss-prices/{name}")
+    
+    @pytest.fixture
+    def test_account(self):
+        account_data = {
+            "name": f"TEST_Profiles_{uuid.uuid4().hex[:8]}",
+            "bosses": {"medio2": 3},
+            "special_bosses": {}
+        }
+        response = requests.post(f"{BASE_URL}/api/accounts", json=account_data)
+        assert response.status_code == 200
+        yield response.json()
+        requests.delete(f"{BASE_URL}/api/accounts/{response.json()['id']}")
+    
+    def test_profile_crud(self, test_profile):
+        response = requests.get(f"{BASE_URL}/api/boss-prices/{test_profile}")
+        assert response.status_code == 200
+        assert response.json()["medio2_price"] == 2.0
+        
+        profiles = [profile["id"] for profile in requests.get(f"{BASE_URL}/api/boss-prices/profiles").json()]
+        assert profiles[0] == "default"
+        assert test_profile in profiles
+        
+        assert requests.delete(f"{BASE_URL}/api/boss-prices/{test_profile}").status_code == 200
+        assert requests.get(f"{BASE_URL}/api/boss-prices/{test_profile}").status_code == 404
+    
+    def test_default_profile_protected(self):
+        assert requests.delete(f"{BASE_URL}/api/boss-prices/default").status_code == 400
+        assert requests.put(f"{BASE_URL}/api/boss-prices/Bad%20Name", json={}).status_code == 400
+    
+    def test_valuations(self, test_profile, test_account):
+        response = requests.get(f"{BASE_URL}/api/accounts/valuations", params={"profiles": f"default,{test_profile}"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["profiles"] == ["default", test_profile]
+        
+        values = {account["id"]: account["values"] for account in data["accounts"]}
+        assert values[test_account["id"]][test_profile] == pytest.approx(6.0)
+        assert values[test_account["id"]]["default"] == test_account["total_usd"]
+        for name in data["profiles"]:
+            assert data["totals"][name] == pytest.approx(sum(v[name] for v in values.values()), abs=0.01)
+    
+    def test_valuations_unknown_profile(self):
+        response = requests.get(f"{BASE_URL}/api/accounts/valuations", params={"profiles": "does_not_exist"})
+        assert response.status_code == 404
+    
+    def test_valuations_etag(self, test_profile, test_account):
+        """Revalidation answers 304 until a price profile changes"""
+        params = {"profiles": f"default,{test_profile}"}
+        response = requests.get(f"{BASE_URL}/api/accounts/valuations", params=params)
+        etag = response.headers["ETag"]
+        
+        response = requests.get(f"{BASE_URL}/api/accounts/valuations", params=params, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        
+        requests.put(f"{BASE_URL}/api/boss-prices/{test_profile}", json={"medio2_price": 3.0})
+        response = requests.get(f"{BASE_URL}/api/accounts/valuations", params=params, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        values = {account["id"]: account["values"] for account in response.json()["accounts"]}
+        assert values[test_account["id"]][test_profile] == pytest.approx(9.0)
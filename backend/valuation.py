@@ -0,0 +1,133 @@
+"""Boss catalog and USD valuation of accounts.
+
+Every priced boss tier is declared once in BOSS_CATALOG; the account and
+price models in server.py and the valuation below are all derived from it.
+"""
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
+
+
+class BossTier(NamedTuple):
+    key: str
+    group: str  # account sub-document holding the kill count
+    default_price: float = 0.0
+
+    @property
+    def price_field(self) -> str:
+        return f"{self.key}_price"
+
+
+BOSS_CATALOG = (
+    BossTier("medio2", "bosses", 0.045),
+    BossTier("grande2", "bosses", 0.09),
+    BossTier("medio4", "bosses", 0.14),
+    BossTier("grande4", "bosses", 0.18),
+    BossTier("medio6", "bosses", 0.36),
+    BossTier("grande6", "bosses", 0.45),
+    BossTier("medio7", "bosses"),
+    BossTier("grande7", "bosses"),
+    BossTier("medio8", "bosses"),
+    BossTier("grande8", "bosses"),
+    BossTier("xama", "special_bosses"),
+    BossTier("praca_4f", "special_bosses"),
+    BossTier("cracha_epica", "special_bosses"),
+)
+
+BOSS_GROUPS = ("bosses", "special_bosses")
+
+
+def tiers_in_group(group: str) -> List[BossTier]:
+    return [tier for tier in BOSS_CATALOG if tier.group == group]
+
+
+def price_vector(prices) -> np.ndarray:
+    """Prices in catalog order, from a BossPrices model"""
+    return np.array([getattr(prices, tier.price_field) for tier in BOSS_CATALOG], dtype=np.float64)
+
+
+def _account_counts(account: dict) -> Iterable[int]:
+    groups = {group: account.get(group) or {} for group in BOSS_GROUPS}
+    for tier in BOSS_CATALOG:
+        yield groups[tier.group].get(tier.key, 0)
+
+
+def count_matrix(accounts: List[dict]) -> np.ndarray:
+    """Kill counts as an accounts x tiers matrix, columns in catalog order"""
+    matrix = np.empty((len(accounts), len(BOSS_CATALOG)), dtype=np.float64)
+    for column, tier in enumerate(BOSS_CATALOG):
+        matrix[:, column] = np.fromiter(
+            ((account.get(tier.group) or {}).get(tier.key, 0) for account in accounts),
+            dtype=np.float64,
+            count=len(accounts)
+        )
+    return matrix
+
+
+def _weighted_sum(matrix: np.ndarray, prices: np.ndarray) -> np.ndarray:
+    """matrix @ prices, summed one tier at a time in catalog order.
+
+    Not a BLAS product: the totals must be bit-identical to
+    calculate_account_usd's loop, or prices with three decimals round
+    .xx5 ties the other way.
+    """
+    totals = np.zeros((matrix.shape[0], *prices.shape[1:]), dtype=np.float64)
+    for column in range(matrix.shape[1]):
+        if prices.ndim == 1:
+            totals += matrix[:, column] * prices[column]
+        else:
+            totals += matrix[:, column, None] * prices[column]
+    return totals
+
+
+def _round_cents(totals: np.ndarray) -> list:
+    # Python's round(), as calculate_account_usd uses; np.round rounds ties differently
+    return [round(total, 2) for total in totals.tolist()]
+
+
+def value_accounts(accounts: List[dict], prices) -> List[float]:
+    """USD value of every account, vectorized over the accounts"""
+    if not accounts:
+        return []
+    return _round_cents(_weighted_sum(count_matrix(accounts), price_vector(prices)))
+
+
+def price_matrix(profiles) -> np.ndarray:
+    """Prices as a tiers x profiles matrix, one column per BossPrices"""
+    return np.column_stack([price_vector(prices) for prices in profiles])
+
+
+def value_accounts_by_profile(accounts: List[dict], profiles) -> List[List[float]]:
+    """USD value of every account under every price profile.
+
+    The (accounts x tiers) by (tiers x profiles) product, accumulated like
+    value_accounts; row i holds account i's value under each profile, in
+    the order given.
+    """
+    if not accounts:
+        return []
+    totals = _weighted_sum(count_matrix(accounts), price_matrix(profiles))
+    return [[round(total, 2) for total in row] for row in totals.tolist()]
+
+
+def usd_expression(prices) -> dict:
+    """calculate_account_usd as an aggregation expression, for pipeline updates.
+
+    Folded one tier at a time in catalog order with two-operand $multiply and
+    $add, the same double operations in the same order as the loop below,
+    then rounded by $round, which like round() rounds the exact value half
+    to even; the stored total equals calculate_account_usd's.
+    """
+    total = 0.0
+    for tier in BOSS_CATALOG:
+        count = {"$ifNull": [f"${tier.group}.{tier.key}", 0]}
+        total = {"$add": [total, {"$multiply": [count, getattr(prices, tier.price_field)]}]}
+    return {"$round": [total, 2]}
+
+
+def calculate_account_usd(account: dict, prices) -> float:
+    """USD value of a single account"""
+    total = 0.0
+    for tier, count in zip(BOSS_CATALOG, _account_counts(account)):
+        total += count * getattr(prices, tier.price_field)
+    return round(total, 2)
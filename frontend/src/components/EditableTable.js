@@ -4,7 +4,7 @@ import { Trash2, CheckCircle2, Circle, Trophy } from "lucide-react";
 import { Button } from "./ui/button";
 import { Input } from "./ui/input";
 
-export default function EditableTable({ accounts, bossPrices, onUpdate, onConfirm, onDelete, onRefresh }) {
+export default function EditableTable({ accounts, bossPrices, onUpdate, onConfirm, onDelete }) {
   const navigate = useNavigate();
   const [editingCell, setEditingCell] = useState(null);
   const [tempValue, setTempValue] = useState("");
@@ -37,8 +37,6 @@ export default function EditableTable({ accounts, bossPrices, onUpdate, onConfir
       } else {
         await onUpdate(accountId, field, finalValue);
       }
-
-      await onRefresh();
     }
     setEditingCell(null);
     setTempValue("");
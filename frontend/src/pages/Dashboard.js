@@ -9,6 +9,26 @@ import { toast } from "sonner";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || "http://localhost:8001";
 const API = `${BACKEND_URL}/api`;
 
+// Aplica as mudanças de um evento (caminhos com ponto, ex. "bosses.medio2") a uma cópia da conta
+const applyChanges = (account, changes) => {
+  const next = structuredClone(account);
+  Object.entries(changes).forEach(([path, value]) => {
+    const keys = path.split(".");
+    let target = next;
+    keys.slice(0, -1).forEach((key) => {
+      if (target[key] === null || typeof target[key] !== "object") {
+        target[key] = {};
+      }
+      target = target[key];
+    });
+    target[keys[keys.length - 1]] = value;
+  });
+  return next;
+};
+
+// Um evento só vale para a conta se não for mais antigo que o que já está na tela
+const isNewer = (account, seq) => seq === undefined || (account.updated_seq ?? 0) <= seq;
+
 export default function Dashboard() {
   const [accounts, setAccounts] = useState([]);
   const [bossPrices, setBossPrices] = useState(null);
@@ -19,17 +39,71 @@ export default function Dashboard() {
     fetchData();
   }, []);
 
+  // Mudanças feitas por qualquer cliente chegam por /api/events (SSE)
+  useEffect(() => {
+    const events = new EventSource(`${API}/events`);
+    let disconnected = false;
+
+    const listen = (type, handler) => {
+      events.addEventListener(type, (message) => handler(JSON.parse(message.data)));
+    };
+
+    listen("created", (event) => {
+      setAccounts((current) =>
+        current.some((account) => account.id === event.id) ? current : [...current, event.account]
+      );
+    });
+    listen("updated", (event) => {
+      setAccounts((current) =>
+        current.map((account) =>
+          account.id === event.id && isNewer(account, event.seq) ? applyChanges(account, event.changes) : account
+        )
+      );
+    });
+    listen("reset", (event) => {
+      const ids = new Set(event.ids);
+      setAccounts((current) =>
+        current.map((account) =>
+          ids.has(account.id) && isNewer(account, event.seq) ? applyChanges(account, event.changes) : account
+        )
+      );
+    });
+    listen("deleted", (event) => {
+      setAccounts((current) => current.filter((account) => account.id !== event.id));
+    });
+    // Novos preços mudam o valor de todas as contas
+    listen("prices", () => fetchData());
+    // Fila cheia no servidor: eventos foram descartados, então recarrega tudo
+    listen("evicted", () => fetchData());
+
+    events.onerror = () => {
+      disconnected = true;
+    };
+    events.onopen = () => {
+      // O que mudou enquanto a conexão esteve fora não chega por eventos
+      if (disconnected) {
+        disconnected = false;
+        fetchData();
+      }
+    };
+
+    return () => events.close();
+  }, []);
+
   const fetchData = async () => {
     try {
-      setLoading(true);
-      const [accountsRes, pricesRes] = await Promise.all([
-        axios.get(`${API}/accounts`),
-        axios.get(`${API}/boss-prices`)
-      ]);
+      // Contas, preços, totais e agendador num único snapshot consistente
+      const response = await axios.get(`${API}/dashboard`);
       
-      setAccounts(accountsRes.data);
-      setBossPrices(pricesRes.data);
+      setAccounts(response.data.accounts);
+      setBossPrices(response.data.boss_prices);
     } catch (error) {
+      if (error.response?.status === 503) {
+        // Escritas em andamento impediram um snapshot consistente; tenta de novo
+        const retryAfter = Number(error.response.headers["retry-after"]) || 1;
+        setTimeout(fetchData, retryAfter * 1000);
+        return;
+      }
       console.error("Erro ao carregar dados:", error);
       toast.error("Erro ao carregar dados");
     } finally {
@@ -37,6 +111,14 @@ export default function Dashboard() {
     }
   };
 
+  const replaceAccount = (updated) => {
+    setAccounts((current) =>
+      current.map((account) =>
+        account.id === updated.id && isNewer(account, updated.updated_seq) ? { ...account, ...updated } : account
+      )
+    );
+  };
+
   const handleAddAccount = async () => {
     try {
       const newAccount = {
@@ -74,7 +156,9 @@ export default function Dashboard() {
       };
       
       const response = await axios.post(`${API}/accounts`, newAccount);
-      setAccounts([...accounts, response.data]);
+      setAccounts((current) =>
+        current.some((account) => account.id === response.data.id) ? current : [...current, response.data]
+      );
       toast.success("Nova conta adicionada!");
     } catch (error) {
       console.error("Erro ao adicionar conta:", error);
@@ -84,8 +168,8 @@ export default function Dashboard() {
 
   const handleUpdateAccount = async (accountId, field, value) => {
     try {
-      await axios.put(`${API}/accounts/${accountId}`, { [field]: value });
-      fetchData();
+      const response = await axios.put(`${API}/accounts/${accountId}`, { [field]: value });
+      replaceAccount(response.data);
     } catch (error) {
       console.error("Erro ao atualizar conta:", error);
       toast.error("Erro ao atualizar conta");
@@ -94,9 +178,9 @@ export default function Dashboard() {
 
   const handleConfirmAccount = async (accountId) => {
     try {
-      await axios.post(`${API}/accounts/${accountId}/confirm`);
+      const response = await axios.post(`${API}/accounts/${accountId}/confirm`);
       toast.success("Contagem confirmada! Resetará em 30 dias.");
-      fetchData();
+      replaceAccount(response.data);
     } catch (error) {
       console.error("Erro ao confirmar conta:", error);
       toast.error("Erro ao confirmar conta");
@@ -107,7 +191,7 @@ export default function Dashboard() {
     try {
       await axios.delete(`${API}/accounts/${accountId}`);
       toast.success("Conta deletada!");
-      fetchData();
+      setAccounts((current) => current.filter((account) => account.id !== accountId));
     } catch (error) {
       console.error("Erro ao deletar conta:", error);
       toast.error("Erro ao deletar conta");
@@ -116,10 +200,11 @@ export default function Dashboard() {
 
   const handleSavePrices = async (priceData) => {
     try {
-      await axios.put(`${API}/boss-prices`, priceData);
+      const response = await axios.put(`${API}/boss-prices`, priceData);
       toast.success("Preços atualizados com sucesso!");
       setShowPriceDialog(false);
-      fetchData();
+      // Os novos valores das contas chegam com o evento "prices"
+      setBossPrices(response.data);
     } catch (error) {
       console.error("Erro ao atualizar preços:", error);
       toast.error("Erro ao atualizar preços");
@@ -178,7 +263,6 @@ export default function Dashboard() {
             onUpdate={handleUpdateAccount}
             onConfirm={handleConfirmAccount}
             onDelete={handleDeleteAccount}
-            onRefresh={fetchData}
           />
         </div>
       </div>